@@ -9,6 +9,10 @@ const path = require("path");
 const FormData = require("form-data"); // To build multipart/form-data for Python API
 
 const PYTHON_API_URL = process.env.PYTHON_API_URL || "http://localhost:8000"; // FastAPI URL
+// Optional axios timeout (ms) for summarization calls. FastAPI gets 80% of it as its
+// timeoutMs budget so it can return a degraded summary before the call times out.
+const PYTHON_API_TIMEOUT_MS = Number(process.env.PYTHON_API_TIMEOUT_MS) || 0;
+const SUMMARY_TIMEOUT_MS = Math.floor(PYTHON_API_TIMEOUT_MS * 0.8);
 
 const User = require("./models/user");
 const Summary = require("./models/summary");
@@ -88,7 +92,9 @@ mongoose
             text: text,
             ratio: ratio,
             selectedOptionValue: selectedOptionValue,
-          }
+            ...(SUMMARY_TIMEOUT_MS && { timeoutMs: SUMMARY_TIMEOUT_MS }),
+          },
+          { timeout: PYTHON_API_TIMEOUT_MS }
         );
         res.json(pythonResponse.data);
       } catch (error) {
@@ -135,6 +141,9 @@ mongoose
         );
         formData.append("ratio", ratio);
         formData.append("selectedOptionValue", selectedOptionValue);
+        if (SUMMARY_TIMEOUT_MS) {
+          formData.append("timeoutMs", SUMMARY_TIMEOUT_MS);
+        }
 
         try {
           const pythonResponse = await axios.post(
@@ -146,6 +155,7 @@ mongoose
               },
               maxContentLength: Infinity,
               maxBodyLength: Infinity,
+              timeout: PYTHON_API_TIMEOUT_MS,
             }
           );
 
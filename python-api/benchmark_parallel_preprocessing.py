@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import time
+
+from benchmark_preprocessing import build_tier_documents
+from extractive_functions import LEMMA_CACHE, TFIDFVectorizer
+from parallel_preprocessing import PreprocessingPool
+
+# Scaling of intra-document parallel preprocessing from 1 to N worker processes.
+# For each long document tier, the serial in-process pipeline is compared with the warm worker pool at every
+# worker count; efficiency is speedup / workers (1.0 = perfect scaling). Lemma caches are disabled in the parent
+# and in the workers so every run does the full work.
+# Usage: python benchmark_parallel_preprocessing.py [--max-workers 4] [--tiers tier_3,tier_4] [--repeat 3] [--json]
+
+
+def best_time(function, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_benchmark(max_workers: int, tiers: list, repeat: int = 3) -> dict:
+    os.environ["LEMMA_CACHE_SIZE"] = "0"  # inherited by the spawned workers
+    lemma_cache_size = LEMMA_CACHE.max_entries
+    LEMMA_CACHE.resize(0)
+
+    vectorizer = TFIDFVectorizer()
+    documents = build_tier_documents()
+    normalized = {tier: [vectorizer._normalize(sentence) for sentence in documents[tier]] for tier in tiers}
+    try:
+        results = {}
+        for tier in tiers:
+            expected, serial_seconds = best_time(lambda: vectorizer.process_normalized(normalized[tier]), repeat)
+            results[tier] = {"sentences": len(normalized[tier]), "serial_seconds": serial_seconds, "workers": {}}
+
+        for workers in range(1, max_workers + 1):
+            pool = PreprocessingPool(workers).start()  # warm before timing
+            try:
+                for tier in tiers:
+                    tokens, seconds = best_time(lambda: pool.process(normalized[tier]), repeat)
+                    speedup = results[tier]["serial_seconds"] / seconds
+                    results[tier]["workers"][workers] = {
+                        "seconds": seconds,
+                        "speedup": speedup,
+                        "efficiency": speedup / workers,
+                        "identical": tokens == vectorizer.process_normalized(normalized[tier]),
+                    }
+            finally:
+                pool.shutdown()
+        return {"repeat": repeat, "cpu_count": os.cpu_count(), "tiers": results}
+    finally:
+        LEMMA_CACHE.resize(lemma_cache_size)
+
+
+def format_table(report: dict) -> str:
+    lines = [f"Best of {report['repeat']} runs, {report['cpu_count']} CPUs"]
+    for tier, row in report["tiers"].items():
+        lines.append(f"{tier} ({row['sentences']} sentences), serial {row['serial_seconds']:.3f}s")
+        lines.append(f"  {'workers':>7} {'seconds':>8} {'speedup':>8} {'efficiency':>10} {'identical':>9}")
+        for workers, result in row["workers"].items():
+            lines.append(
+                f"  {workers:>7} {result['seconds']:>8.3f} {result['speedup']:>7.2f}x {result['efficiency']:>10.2f} "
+                f"{str(result['identical']):>9}"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel preprocessing scaling from 1 to N workers.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count to test.")
+    parser.add_argument("--tiers", default="tier_3,tier_4", help="Comma-separated document tiers to run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per measurement (best is kept).")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.max_workers, args.tiers.split(","), args.repeat)
+    print(json.dumps(report, indent=2) if args.json else format_table(report))
@@ -0,0 +1,100 @@
+import argparse
+import difflib
+import io
+import json
+import time
+
+from helper_file_functions import PDF_FIDELITY_TIERS, extract_pdf_content
+from sample_corpus import load_sample_corpus
+
+# Speed and output differences of the PDF extraction fidelity tiers on the sample PDFs.
+# Every tier extracts every unique sample PDF (best of --repeat runs). The output of each cheaper tier is then
+# diffed line by line against the full tier: lines the light tier drops, lines it adds, and the overall text
+# similarity, so it is clear for which documents the fast tier is safe to use. --max-chars measures the tiers
+# with an extraction budget (early stop), as the API's maxChars does.
+# Usage: python benchmark_pdf_fidelity.py [--repeat 3] [--max-chars 1500] [--show-lines 5] [--json]
+
+REFERENCE_TIER = "full"
+
+
+def time_extraction(contents: bytes, fidelity: str, repeat: int, max_chars: int = None):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extract_pdf_content(io.BytesIO(contents), fidelity=fidelity, max_chars=max_chars)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def diff_lines(reference: str, candidate: str) -> dict:
+    reference_lines = reference.splitlines()
+    candidate_lines = candidate.splitlines()
+    matcher = difflib.SequenceMatcher(None, reference_lines, candidate_lines, autojunk=False)
+    removed, added = [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            removed.extend(reference_lines[i1:i2])
+        if tag in ("replace", "insert"):
+            added.extend(candidate_lines[j1:j2])
+    return {
+        "identical": reference == candidate,
+        "line_similarity": matcher.ratio(),
+        "removed_lines": removed,
+        "added_lines": added,
+    }
+
+
+def run_benchmark(repeat: int = 3, max_chars: int = None) -> dict:
+    documents = {}
+    for name, file_extension, contents in load_sample_corpus():
+        if file_extension != "pdf":
+            continue
+        tiers = {}
+        for fidelity in PDF_FIDELITY_TIERS:
+            content, seconds = time_extraction(contents, fidelity, repeat, max_chars)
+            tiers[fidelity] = {"seconds": seconds, "chars": len(content["text"]), "text": content["text"]}
+            pages = content["pages_extracted"]
+        reference = tiers[REFERENCE_TIER]
+        for fidelity, tier in tiers.items():
+            tier["speedup"] = reference["seconds"] / tier["seconds"]
+            if fidelity != REFERENCE_TIER:
+                tier["diff"] = diff_lines(reference["text"], tier["text"])
+        for tier in tiers.values():
+            del tier["text"]
+        documents[name] = {"pages": pages, "bytes": len(contents), "tiers": tiers}
+    return {"repeat": repeat, "max_chars": max_chars, "reference": REFERENCE_TIER, "documents": documents}
+
+
+def format_report(report: dict, show_lines: int = 5) -> str:
+    budget = f", max_chars={report['max_chars']}" if report["max_chars"] else ""
+    lines = [f"Best of {report['repeat']} runs{budget}, diffs against the {report['reference']} tier"]
+    header = f"  {'tier':<6} {'seconds':>8} {'speedup':>8} {'chars':>8} {'similar':>8} {'-lines':>7} {'+lines':>7}"
+    for name, document in report["documents"].items():
+        lines.append(f"{name} ({document['pages']} pages, {document['bytes'] / 1024:.0f} KB)")
+        lines.append(header)
+        for fidelity, tier in document["tiers"].items():
+            diff = tier.get("diff")
+            similarity = f"{diff['line_similarity']:.3f}" if diff else "-"
+            removed = len(diff["removed_lines"]) if diff else "-"
+            added = len(diff["added_lines"]) if diff else "-"
+            lines.append(
+                f"  {fidelity:<6} {tier['seconds']:>8.3f} {tier['speedup']:>7.2f}x {tier['chars']:>8} "
+                f"{similarity:>8} {removed:>7} {added:>7}"
+            )
+            if diff and show_lines:
+                lines.extend(f"    - {line[:100]}" for line in diff["removed_lines"][:show_lines])
+                lines.extend(f"    + {line[:100]}" for line in diff["added_lines"][:show_lines])
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark and diff the PDF extraction fidelity tiers.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per tier (best is kept).")
+    parser.add_argument("--max-chars", type=int, default=None, help="Stop extracting after this many body characters.")
+    parser.add_argument("--show-lines", type=int, default=5, help="Differing lines to print per document and side.")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat, args.max_chars)
+    print(json.dumps(report, indent=2) if args.json else format_report(report, args.show_lines))
@@ -0,0 +1,97 @@
+import argparse
+import json
+import random
+import time
+
+from extractive_functions import LEMMA_CACHE, SENTENCE_CACHE, TFIDFVectorizer, get_preprocessing_cache_stats
+from parallel_preprocessing import serial_preprocessing
+from sample_corpus import load_sample_texts
+from sentence_segmenters import get_segmenter
+
+# Measures the sentence and lemma caches used by TFIDFVectorizer.preprocess_documents.
+# "repeated": the same documents are preprocessed again (boilerplate, re-uploads).
+# "novel": every sentence is new (words shuffled) but the vocabulary is shared, so only lemmas can hit.
+# Preprocessing stays in this process: worker processes keep their own caches, which these stats cannot see.
+# Usage: python benchmark_preprocess_cache.py [--json]
+
+
+def build_corpora(seed: int) -> dict:
+    rng = random.Random(seed)
+    segment_sentences = get_segmenter("punkt")
+    documents = [segment_sentences(text) for _, text in load_sample_texts()]
+
+    novel_documents = []
+    for sentences in documents:
+        shuffled_sentences = []
+        for sentence in sentences:
+            words = sentence.split()
+            rng.shuffle(words)
+            shuffled_sentences.append(" ".join(words))
+        novel_documents.append(shuffled_sentences)
+
+    return {"repeated": documents, "novel": novel_documents}
+
+
+def preprocess_all(documents: list) -> float:
+    start = time.perf_counter()
+    for sentences in documents:
+        TFIDFVectorizer().preprocess_documents(sentences)
+    return time.perf_counter() - start
+
+
+def set_cache_sizes(sentence_entries: int, lemma_entries: int):
+    for cache, size in ((SENTENCE_CACHE, sentence_entries), (LEMMA_CACHE, lemma_entries)):
+        cache.clear()
+        cache.resize(size)
+
+
+def run_benchmark(seed: int = 0) -> dict:
+    corpora = build_corpora(seed)
+    original_sizes = (SENTENCE_CACHE.max_entries, LEMMA_CACHE.max_entries)
+    results = {}
+    try:
+        with serial_preprocessing():
+            # Uncached baseline for the original documents
+            set_cache_sizes(0, 0)
+            uncached = preprocess_all(corpora["repeated"])
+
+            # Warm the caches with the original documents, then measure each corpus against them
+            set_cache_sizes(*original_sizes)
+            cold = preprocess_all(corpora["repeated"])
+            for name, documents in corpora.items():
+                for cache in (SENTENCE_CACHE, LEMMA_CACHE):
+                    cache.hits = cache.misses = 0
+                warm = preprocess_all(documents)
+                results[name] = {
+                    "sentences": sum(len(sentences) for sentences in documents),
+                    "seconds": warm,
+                    "speedup_vs_uncached": uncached / warm if warm > 0 else float("inf"),
+                    "caches": get_preprocessing_cache_stats(),
+                }
+    finally:
+        set_cache_sizes(*original_sizes)
+
+    return {"uncached_seconds": uncached, "cold_cache_seconds": cold, "corpora": results}
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        f"Uncached: {report['uncached_seconds']:.3f}s   first pass with caches (cold): {report['cold_cache_seconds']:.3f}s",
+        f"{'corpus':<9} {'sentences':>9} {'seconds':>9} {'speedup':>8} {'sentence hit %':>15} {'lemma hit %':>12}",
+    ]
+    for name, row in report["corpora"].items():
+        lines.append(
+            f"{name:<9} {row['sentences']:>9} {row['seconds']:>9.3f} {row['speedup_vs_uncached']:>7.2f}x "
+            f"{100 * row['caches']['sentence']['hit_rate']:>15.1f} {100 * row['caches']['lemma']['hit_rate']:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing caches on repeated and novel text.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.seed)
+    print(json.dumps(report, indent=2) if args.json else format_table(report))
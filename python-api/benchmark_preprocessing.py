@@ -0,0 +1,151 @@
+import argparse
+import json
+import string
+import time
+from collections import Counter
+
+import nltk
+import numpy as np
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+from extractive_functions import LEMMA_CACHE, SENTENCE_CACHE, TFIDFVectorizer, TextRankSummarizer
+from parallel_preprocessing import serial_preprocessing
+from sample_corpus import load_sample_texts
+from sentence_segmenters import get_segmenter
+
+# Compares the batched, preprocess-once TFIDFVectorizer with the previous per-sentence implementation.
+# Documents are assembled from the sample corpus at one size per document length tier.
+# The preprocessing caches are disabled so repeated runs measure the pipeline, not cache hits
+# (see benchmark_preprocess_cache.py for those), and preprocessing stays in this process so the "after" numbers
+# measure batching alone (see benchmark_parallel_preprocessing.py for the worker pool).
+# Usage: python benchmark_preprocessing.py [--repeat 3] [--json]
+
+TIER_SENTENCE_COUNTS = {
+    "tier_1": 15,
+    "tier_2": 80,
+    "tier_3": 300,
+    "tier_4": 800,
+}
+
+
+class PerSentenceTFIDFVectorizer(TFIDFVectorizer):
+    # Previous behaviour: one pos_tag call per sentence, and every sentence preprocessed in both fit and transform
+
+    def preprocess_text(self, input_text):
+        input_text = self.remove_emojis_and_symbols(input_text.lower())
+        words = word_tokenize(input_text.translate(str.maketrans('', '', string.punctuation)))
+        stop_words = set(stopwords.words('english'))
+        tokens = [word for word in words if word not in stop_words]
+        lemmatizer = WordNetLemmatizer()
+        return [lemmatizer.lemmatize(word, pos=self.get_wordnet_pos(tag)) for word, tag in nltk.pos_tag(tokens)]
+
+    def _get_processed_documents(self, documents):
+        return [self.preprocess_text(document) for document in documents]
+
+    def transform(self, documents):
+        tfidf_matrix = []
+        for processed_tokens in self._get_processed_documents(documents):
+            word_counts = Counter(processed_tokens)
+            tfidf_vector = np.zeros(len(self.vocabulary))
+            for word in processed_tokens:
+                if word in self.word_to_idx:
+                    tf = word_counts[word] / sum(word_counts.values())
+                    tfidf_vector[self.word_to_idx[word]] = tf * self._calculate_idf(word)
+            norm_val = np.linalg.norm(tfidf_vector)
+            if self.norm == 'l2' and norm_val > 0:
+                tfidf_vector = tfidf_vector / norm_val
+            tfidf_matrix.append(tfidf_vector)
+        return np.array(tfidf_matrix)
+
+
+def build_tier_documents() -> dict:
+    segment_sentences = get_segmenter("punkt")
+    sentences = []
+    for _, text in load_sample_texts():
+        sentences.extend(segment_sentences(text))
+
+    documents = {}
+    for tier, count in TIER_SENTENCE_COUNTS.items():
+        # Cycle through the corpus when a tier needs more sentences than are available
+        documents[tier] = [sentences[i % len(sentences)] for i in range(count)]
+    return documents
+
+
+def best_time(function, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def summarize_with(vectorizer_class, text: str):
+    summarizer = TextRankSummarizer(segmenter="punkt", vectorizer_class=vectorizer_class)
+    return summarizer.summarize(text, selectedOptionValue="medium")
+
+
+def run_benchmark(repeat: int = 3) -> dict:
+    cache_sizes = (SENTENCE_CACHE.max_entries, LEMMA_CACHE.max_entries)
+    SENTENCE_CACHE.resize(0)
+    LEMMA_CACHE.resize(0)
+    try:
+        with serial_preprocessing():
+            return {"repeat": repeat, "tiers": run_tiers(repeat)}
+    finally:
+        SENTENCE_CACHE.resize(cache_sizes[0])
+        LEMMA_CACHE.resize(cache_sizes[1])
+
+
+def run_tiers(repeat: int) -> dict:
+    results = {}
+    for tier, sentences in build_tier_documents().items():
+        text = " ".join(sentences)
+
+        old_vectors, old_vectorize = best_time(lambda: PerSentenceTFIDFVectorizer().fit_transform(sentences), repeat)
+        new_vectors, new_vectorize = best_time(lambda: TFIDFVectorizer().fit_transform(sentences), repeat)
+        old_summary, old_end_to_end = best_time(lambda: summarize_with(PerSentenceTFIDFVectorizer, text), repeat)
+        new_summary, new_end_to_end = best_time(lambda: summarize_with(TFIDFVectorizer, text), repeat)
+
+        results[tier] = {
+            "sentences": len(sentences),
+            "vectorize_seconds_before": old_vectorize,
+            "vectorize_seconds_after": new_vectorize,
+            "vectorize_speedup": old_vectorize / new_vectorize,
+            "end_to_end_seconds_before": old_end_to_end,
+            "end_to_end_seconds_after": new_end_to_end,
+            "end_to_end_speedup": old_end_to_end / new_end_to_end,
+            "identical_vectors": bool(old_vectors.shape == new_vectors.shape and np.allclose(old_vectors, new_vectors)),
+            "identical_summary": old_summary == new_summary,
+        }
+    return results
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        f"Best of {report['repeat']} runs",
+        f"{'tier':<8} {'sentences':>9} {'vectorize before/after (s)':>27} {'speedup':>8} "
+        f"{'end-to-end before/after (s)':>28} {'speedup':>8} {'identical':>9}",
+    ]
+    for tier, row in report["tiers"].items():
+        identical = row["identical_vectors"] and row["identical_summary"]
+        lines.append(
+            f"{tier:<8} {row['sentences']:>9} "
+            f"{row['vectorize_seconds_before']:>13.3f} / {row['vectorize_seconds_after']:<11.3f} {row['vectorize_speedup']:>7.2f}x "
+            f"{row['end_to_end_seconds_before']:>14.3f} / {row['end_to_end_seconds_after']:<11.3f} {row['end_to_end_speedup']:>7.2f}x "
+            f"{str(identical):>9}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched TF-IDF preprocessing per document length tier.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per measurement (best is kept).")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat)
+    print(json.dumps(report, indent=2) if args.json else format_table(report))
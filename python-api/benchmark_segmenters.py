@@ -0,0 +1,115 @@
+import argparse
+import json
+import time
+
+from sample_corpus import load_sample_texts
+from sentence_segmenters import SEGMENTERS
+
+# Benchmarks every sentence segmenter on the sample corpus.
+# Reports throughput and how well each backend's sentence boundaries agree with punkt.
+# Usage: python benchmark_segmenters.py [--repeat 5] [--json]
+
+
+def boundary_offsets(text: str, sentences: list) -> set:
+    # Map each sentence back to its end offset in the original text
+    offsets = set()
+    cursor = 0
+    for sentence in sentences:
+        position = text.find(sentence, cursor)
+        if position == -1:
+            continue
+        cursor = position + len(sentence)
+        offsets.add(cursor)
+    # The end of the text is a boundary for every segmenter; it says nothing about agreement
+    offsets.discard(len(text.rstrip()))
+    return offsets
+
+
+def boundary_agreement(reference: set, candidate: set) -> dict:
+    true_positives = len(reference & candidate)
+    precision = true_positives / len(candidate) if candidate else 1.0
+    recall = true_positives / len(reference) if reference else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def time_segmenter(segmenter, text: str, repeat: int):
+    best = float("inf")
+    sentences = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sentences = segmenter(text)
+        best = min(best, time.perf_counter() - start)
+    return sentences, best
+
+
+def run_benchmark(repeat: int = 5) -> dict:
+    corpus = load_sample_texts()
+    total_chars = sum(len(text) for _, text in corpus)
+    results = {}
+
+    reference_boundaries = {}
+    for name, text in corpus:
+        reference_boundaries[name] = boundary_offsets(text, SEGMENTERS["punkt"](text))
+
+    for segmenter_name, segmenter in SEGMENTERS.items():
+        total_seconds = 0.0
+        total_sentences = 0
+        matched = 0
+        candidate_count = 0
+        reference_count = 0
+        per_document = {}
+
+        for name, text in corpus:
+            sentences, seconds = time_segmenter(segmenter, text, repeat)
+            candidate = boundary_offsets(text, sentences)
+            reference = reference_boundaries[name]
+
+            total_seconds += seconds
+            total_sentences += len(sentences)
+            matched += len(reference & candidate)
+            candidate_count += len(candidate)
+            reference_count += len(reference)
+            per_document[name] = {
+                "sentences": len(sentences),
+                "seconds": seconds,
+                **boundary_agreement(reference, candidate),
+            }
+
+        precision = matched / candidate_count if candidate_count else 1.0
+        recall = matched / reference_count if reference_count else 1.0
+        results[segmenter_name] = {
+            "sentences": total_sentences,
+            "seconds": total_seconds,
+            "chars_per_second": total_chars / total_seconds if total_seconds > 0 else float("inf"),
+            "precision": precision,
+            "recall": recall,
+            "f1": 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0,
+            "documents": per_document,
+        }
+
+    return {"documents": len(corpus), "characters": total_chars, "repeat": repeat, "segmenters": results}
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        f"Corpus: {report['documents']} documents, {report['characters']} characters (best of {report['repeat']})",
+        f"{'segmenter':<10} {'sentences':>9} {'ms':>9} {'chars/s':>12} {'precision':>9} {'recall':>7} {'f1':>6}",
+    ]
+    for name, row in report["segmenters"].items():
+        lines.append(
+            f"{name:<10} {row['sentences']:>9} {row['seconds'] * 1000:>9.2f} {row['chars_per_second']:>12.0f} "
+            f"{row['precision']:>9.3f} {row['recall']:>7.3f} {row['f1']:>6.3f}"
+        )
+    lines.append("Agreement is measured against punkt sentence boundaries.")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sentence segmenters against punkt.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per document (best is kept).")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat)
+    print(json.dumps(report, indent=2) if args.json else format_table(report))
@@ -0,0 +1,249 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from sample_corpus import SAMPLE_UPLOADS_DIR, SUPPORTED_EXTENSIONS
+
+# Offline bulk summarization: re-summarizes every .txt/.pdf/.docx file under a directory (e.g. after an
+# algorithm change) without going through the HTTP API. Files are extracted and summarized in parallel worker
+# processes and each result is appended to a JSONL file as soon as it finishes.
+#
+# The output file doubles as the checkpoint: on start it is read back, and a file is skipped when a record with
+# the same path, content hash and run fingerprint (effective summary settings, including the deployment's segmenter
+# and vectorizer configuration, plus a hash of the summarization source code) already exists. An interrupted run therefore resumes where it stopped, unchanged files are not redone, and
+# changing the algorithm or the settings re-summarizes everything. When a file changes, its newer record is
+# appended after the old one; readers should take the last record per path.
+# Usage:
+#   python bulk_summarize.py [input_dir] [--output bulk_results.jsonl] [--option medium] [--workers 4] [--force]
+
+# Source files whose contents define "the algorithm" for the run fingerprint
+ALGORITHM_SOURCES = ("extractive_functions.py", "sentence_segmenters.py", "helper_file_functions.py",
+                     "execution_planner.py")
+DEFAULT_OUTPUT = "bulk_results.jsonl"
+
+
+def algorithm_hash() -> str:
+    digest = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for filename in ALGORITHM_SOURCES:
+        with open(os.path.join(base_dir, filename), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def effective_settings(settings: dict) -> dict:
+    # Resolves deployment defaults (SENTENCE_SEGMENTER, TFIDF_VECTORIZER, HASHING_*, SUMMARY_MEMORY_BUDGET_MB,
+    # SUMMARY_OVERSIZE_POLICY) so that the fingerprint changes whenever the configuration that selects the
+    # algorithm does, not only when the CLI arguments do
+    from execution_planner import SUMMARY_MEMORY_BUDGET_MB, SUMMARY_OVERSIZE_POLICY
+    from extractive_functions import HASHING_N_FEATURES, HASHING_REVERSE_MAP_SIZE, VECTORIZERS, get_vectorizer_class
+    from sentence_segmenters import DEFAULT_SEGMENTER
+
+    vectorizer_class = get_vectorizer_class()
+    resolved = {
+        **settings,
+        "segmenter": (settings["segmenter"] or DEFAULT_SEGMENTER).lower().strip(),
+        "vectorizer": next(name for name, cls in VECTORIZERS.items() if cls is vectorizer_class),
+        "memory_budget_mb": SUMMARY_MEMORY_BUDGET_MB,
+        "oversize_policy": SUMMARY_OVERSIZE_POLICY,
+    }
+    if resolved["vectorizer"] == "hashing":
+        resolved["hashing_n_features"] = HASHING_N_FEATURES
+        resolved["hashing_reverse_map_size"] = HASHING_REVERSE_MAP_SIZE
+    return resolved
+
+
+def run_fingerprint(settings: dict) -> str:
+    payload = json.dumps({**settings, "algorithm": algorithm_hash()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def find_documents(input_dir: str) -> list:
+    # -> [(relative path, absolute path, extension)] in a stable order
+    documents = []
+    for root, dirs, filenames in os.walk(input_dir):
+        dirs.sort()
+        for filename in sorted(filenames):
+            file_extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+            if file_extension in SUPPORTED_EXTENSIONS:
+                path = os.path.join(root, filename)
+                documents.append((os.path.relpath(path, input_dir), path, file_extension))
+    return documents
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(output_path: str) -> set:
+    # -> {(path, content_hash, fingerprint)} already written.
+    # A partial last line left by a crash is cut off so that new records start on a line of their own;
+    # complete lines that do not parse are skipped, never truncated, so later records survive them.
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        complete_bytes = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            complete_bytes += len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("status") == "ok":
+                done.add((record["path"], record["content_hash"], record["fingerprint"]))
+        f.truncate(complete_bytes)
+    return done
+
+
+# --- Worker side ---
+
+def _init_worker():
+    # Load NLTK data once per worker instead of on its first document
+    from extractive_functions import TFIDFVectorizer
+    TFIDFVectorizer().process_normalized(["warm up the worker"])
+
+
+def summarize_file(path: str, file_extension: str, settings: dict) -> dict:
+    from execution_planner import plan_execution
+    from extractive_functions import Extractive_Summarizer
+    from helper_file_functions import extract_text_from_bytes
+    from summary_service import count_words, planned_text
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        contents = f.read()
+    text = extract_text_from_bytes(contents, file_extension)
+    extracted = time.perf_counter()
+    if not text.strip():
+        raise ValueError("Extracted text is empty or contains only whitespace.")
+
+    # Same memory-bounded planning as the API: large stored documents must not allocate dense n x n arrays
+    plan = plan_execution(text)
+    summary, keywords = Extractive_Summarizer(
+        planned_text(text, plan), settings["ratio"], settings["option"], settings["segmenter"], execution=plan.mode
+    )
+    finished = time.perf_counter()
+    return {
+        "summary": summary,
+        "keywords": list(keywords),
+        "degradations": plan.degradations(),
+        "execution_plan": plan.as_dict(),
+        "bytes": len(contents),
+        "originalWordCount": count_words(text),
+        "summaryWordCount": count_words(summary),
+        "extract_seconds": extracted - start,
+        "summarize_seconds": finished - extracted,
+    }
+
+
+# --- Coordinator ---
+
+def run_bulk(input_dir: str, output_path: str, settings: dict, workers: int, force: bool = False) -> dict:
+    started = time.perf_counter()
+    settings = effective_settings(settings)
+    fingerprint = run_fingerprint(settings)
+    done = load_checkpoint(output_path)  # also repairs the file before anything is appended to it
+    if force:
+        done = set()
+
+    # Group by content hash: identical uploads are summarized once and recorded under every path
+    pending = {}
+    stats = {"files": 0, "skipped_unchanged": 0, "duplicates": 0, "processed": 0, "failed": 0, "bytes": 0,
+             "words": 0, "latencies": []}
+    for relative_path, path, file_extension in find_documents(input_dir):
+        stats["files"] += 1
+        content_hash = file_hash(path)
+        if (relative_path, content_hash, fingerprint) in done:
+            stats["skipped_unchanged"] += 1
+            continue
+        if content_hash in pending:
+            stats["duplicates"] += 1
+            pending[content_hash]["paths"].append(relative_path)
+        else:
+            pending[content_hash] = {"path": path, "extension": file_extension, "paths": [relative_path]}
+
+    # Workers parallelize across documents, so they must not also start intra-document preprocessing pools
+    os.environ["PREPROCESS_WORKERS"] = "0"
+    context = multiprocessing.get_context("spawn")
+    with open(output_path, "a", encoding="utf-8") as output, \
+         ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        futures = {pool.submit(summarize_file, entry["path"], entry["extension"], settings): (content_hash, entry)
+                   for content_hash, entry in pending.items()}
+        try:
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    content_hash, entry = futures.pop(future)
+                    try:
+                        result = {"status": "ok", **future.result()}
+                        stats["processed"] += len(entry["paths"])
+                        stats["bytes"] += result["bytes"]
+                        stats["words"] += result["originalWordCount"]
+                        stats["latencies"].append(result["extract_seconds"] + result["summarize_seconds"])
+                    except BrokenProcessPool:
+                        raise  # a worker died: stop without recording the remaining files, so a rerun retries them
+                    except Exception as e:
+                        result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+                        stats["failed"] += len(entry["paths"])
+                    for relative_path in entry["paths"]:
+                        record = {"path": relative_path, "content_hash": content_hash, "fingerprint": fingerprint,
+                                  "settings": settings, **result}
+                        output.write(json.dumps(record) + "\n")
+                    output.flush()
+        except KeyboardInterrupt:
+            # Everything written so far is the checkpoint; the next run picks up the rest
+            for future in futures:
+                future.cancel()
+            stats["interrupted"] = True
+
+    stats["wall_seconds"] = time.perf_counter() - started
+    return stats
+
+
+def percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def format_summary(stats: dict, workers: int) -> str:
+    seconds = max(stats["wall_seconds"], 1e-9)
+    latencies = stats["latencies"]
+    lines = [
+        f"{stats['files']} files: {stats['processed']} summarized ({stats['duplicates']} duplicates), "
+        f"{stats['skipped_unchanged']} unchanged, {stats['failed']} failed"
+        + (" - interrupted, rerun to resume" if stats.get("interrupted") else ""),
+        f"{seconds:.2f}s on {workers} workers: {stats['processed'] / seconds:.2f} files/s, "
+        f"{stats['bytes'] / seconds / (1024 * 1024):.2f} MB/s, {stats['words'] / seconds:.0f} words/s",
+        f"per-document latency p50 {percentile(latencies, 0.5):.2f}s, p95 {percentile(latencies, 0.95):.2f}s",
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize every document in a directory into a JSONL file.")
+    parser.add_argument("input_dir", nargs="?", default=SAMPLE_UPLOADS_DIR, help="Directory of .txt/.pdf/.docx files.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSONL results file (also the resume checkpoint).")
+    parser.add_argument("--option", default="medium", help="Summary length option (very_short, short, medium, long).")
+    parser.add_argument("--ratio", type=float, default=0.3, help="Summary ratio passed to the summarizer.")
+    parser.add_argument("--segmenter", default=None, help="Sentence segmenter backend (default: deployment default).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--force", action="store_true", help="Re-summarize files even if they are unchanged.")
+    args = parser.parse_args()
+
+    run_settings = {"option": args.option, "ratio": args.ratio, "segmenter": args.segmenter}
+    summary_stats = run_bulk(args.input_dir, args.output, run_settings, args.workers, args.force)
+    print(format_summary(summary_stats, args.workers))
@@ -0,0 +1,62 @@
+import math
+import threading
+import time
+
+
+class SummarizationCancelled(Exception):
+    # The caller went away (client disconnect); the work should stop as soon as possible
+    pass
+
+
+class DeadlineExceeded(Exception):
+    # Raised inside a pipeline stage so the summarizer can fall back to a cheaper result
+    pass
+
+
+class Deadline:
+    # Time budget for one summarization request, shared between the API layer and the pipeline.
+    # The pipeline checks it between stages, records which degradations it applied,
+    # and stops when the API layer cancels it.
+
+    def __init__(self, timeout_seconds: float = None):
+        self.started_at = time.monotonic()
+        self.timeout_seconds = timeout_seconds
+        self.expires_at = None if timeout_seconds is None else self.started_at + timeout_seconds
+        self.degradations = []
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_milliseconds(cls, timeout_ms: int = None):
+        return cls(None if timeout_ms is None else timeout_ms / 1000.0)
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_fraction(self) -> float:
+        if self.expires_at is None or self.timeout_seconds <= 0:
+            return 1.0
+        return self.remaining() / self.timeout_seconds
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check_cancelled(self):
+        if self.is_cancelled():
+            raise SummarizationCancelled("Summarization cancelled")
+
+    def check(self):
+        self.check_cancelled()
+        if self.expired():
+            raise DeadlineExceeded("Summarization deadline exceeded")
+
+    def degrade(self, degradation: str):
+        if degradation not in self.degradations:
+            self.degradations.append(degradation)
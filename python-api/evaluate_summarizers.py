@@ -0,0 +1,222 @@
+import argparse
+import csv
+import json
+import re
+import time
+import tracemalloc
+
+from extractive_functions import (
+    LEMMA_CACHE, SENTENCE_CACHE, TextRankSummarizer, get_summary_sentence_count, get_vectorizer_class,
+)
+from parallel_preprocessing import serial_preprocessing
+from sample_corpus import load_sample_texts
+
+# Quality-vs-speed evaluation of TextRankSummarizer configurations.
+# Every configuration summarizes the same fixed corpus. The "exact" configuration (Punkt, vocabulary TF-IDF, dense
+# execution, pinned so deployment defaults such as SENTENCE_SEGMENTER cannot change it) is the reference: each other configuration is scored by ROUGE-1/2/L against the exact summary and by how many
+# of the exact pipeline's sentences it selects. Wall time and peak traced memory are measured in separate runs,
+# with preprocessing kept in this process (no pool spin-up charged to one configuration, no untraced workers),
+# and configurations that no other configuration beats on time, memory and ROUGE-L are marked Pareto-optimal.
+# Usage:
+#   python evaluate_summarizers.py [--length medium] [--configs exact,regex_segmenter] [--json out.json] [--csv out.csv]
+#   python evaluate_summarizers.py --config 'my_mode={"k_neighbors": 3, "max_iterations": 20}'
+
+REFERENCE_CONFIGURATION = "exact"
+
+# name -> TextRankSummarizer keyword arguments ("vectorizer" is a TF-IDF backend name, see VECTORIZERS).
+# Every configuration (including --config extras) is applied on top of the pinned reference settings, so it
+# differs from "exact" only in the settings it names, whatever the deployment defaults are.
+CONFIGURATIONS = {
+    "exact": {"segmenter": "punkt", "vectorizer": "vocabulary", "execution": "dense"},
+    "regex_segmenter": {"segmenter": "regex"},
+    "k_neighbors_2": {"k_neighbors": 2},
+    "pagerank_10_iterations": {"max_iterations": 10},
+    "approximate_similarity_20": {"similarity_window": 20},
+    "approximate_similarity_5": {"similarity_window": 5},
+    "hashing_vectorizer": {"vectorizer": "hashing"},
+    "sparse_execution": {"execution": "sparse"},
+    "hierarchical_execution": {"execution": "hierarchical"},
+}
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def words(text: str) -> list:
+    return WORD_PATTERN.findall(text.lower())
+
+
+def ngrams(tokens: list, n: int) -> dict:
+    counts = {}
+    for i in range(len(tokens) - n + 1):
+        gram = tuple(tokens[i:i + n])
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def f1(overlap: float, candidate_total: int, reference_total: int) -> float:
+    if candidate_total == 0 or reference_total == 0:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+
+
+def rouge_n(candidate: list, reference: list, n: int) -> float:
+    candidate_grams = ngrams(candidate, n)
+    reference_grams = ngrams(reference, n)
+    overlap = sum(min(count, reference_grams.get(gram, 0)) for gram, count in candidate_grams.items())
+    return f1(overlap, sum(candidate_grams.values()), sum(reference_grams.values()))
+
+
+def rouge_l(candidate: list, reference: list) -> float:
+    # Longest common subsequence with a rolling row to keep memory linear
+    if not candidate or not reference:
+        return 0.0
+    previous = [0] * (len(reference) + 1)
+    for candidate_word in candidate:
+        current = [0]
+        for j, reference_word in enumerate(reference):
+            if candidate_word == reference_word:
+                current.append(previous[j] + 1)
+            else:
+                current.append(max(previous[j + 1], current[j]))
+        previous = current
+    return f1(previous[-1], len(candidate), len(reference))
+
+
+def selected_sentences(ranking, length: str) -> list:
+    if not ranking.ranked_indices:
+        return []
+    count = get_summary_sentence_count(len(ranking.sentences), length)
+    return [ranking.sentences[idx] for idx in sorted(ranking.ranked_indices[:count])]
+
+
+def run_configuration(config: dict, text: str, length: str):
+    config = {**CONFIGURATIONS[REFERENCE_CONFIGURATION], **config}
+    if "vectorizer" in config:
+        config["vectorizer_class"] = get_vectorizer_class(config.pop("vectorizer"))
+    ranking = TextRankSummarizer(**config).rank(text)
+    return ranking.summary_for_option(length), selected_sentences(ranking, length)
+
+
+def measure(config: dict, text: str, length: str) -> dict:
+    # Cold preprocessing caches for every run so configurations are compared fairly
+    SENTENCE_CACHE.clear()
+    LEMMA_CACHE.clear()
+    start = time.perf_counter()
+    summary, sentences = run_configuration(config, text, length)
+    seconds = time.perf_counter() - start
+
+    # Separate run for memory: tracing slows execution down and would distort the timing
+    SENTENCE_CACHE.clear()
+    LEMMA_CACHE.clear()
+    tracemalloc.start()
+    try:
+        run_configuration(config, text, length)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"summary": summary, "sentences": sentences, "seconds": seconds, "peak_bytes": peak_bytes}
+
+
+def sentence_overlap(candidate: list, reference: list) -> float:
+    # Share of the reference sentences that the candidate also selected (whitespace-normalized text match)
+    if not reference:
+        return 1.0
+    normalize = lambda sentence: " ".join(sentence.split())
+    candidate_set = {normalize(sentence) for sentence in candidate}
+    return sum(1 for sentence in reference if normalize(sentence) in candidate_set) / len(reference)
+
+
+def mark_pareto(rows: list):
+    for row in rows:
+        row["pareto_optimal"] = not any(
+            other is not row
+            and other["seconds"] <= row["seconds"]
+            and other["peak_mb"] <= row["peak_mb"]
+            and other["rouge_l"] >= row["rouge_l"]
+            and (other["seconds"] < row["seconds"] or other["peak_mb"] < row["peak_mb"] or other["rouge_l"] > row["rouge_l"])
+            for other in rows
+        )
+
+
+def evaluate(configurations: dict, length: str = "medium") -> dict:
+    corpus = load_sample_texts()
+    configurations = {REFERENCE_CONFIGURATION: CONFIGURATIONS[REFERENCE_CONFIGURATION], **configurations}
+
+    with serial_preprocessing():
+        measurements = {name: [measure(config, text, length) for _, text in corpus]
+                        for name, config in configurations.items()}
+    reference = measurements[REFERENCE_CONFIGURATION]
+
+    rows = []
+    for name, runs in measurements.items():
+        scores = {"rouge_1": 0.0, "rouge_2": 0.0, "rouge_l": 0.0, "sentence_overlap": 0.0}
+        for run, reference_run in zip(runs, reference):
+            candidate_words = words(run["summary"])
+            reference_words = words(reference_run["summary"])
+            scores["rouge_1"] += rouge_n(candidate_words, reference_words, 1)
+            scores["rouge_2"] += rouge_n(candidate_words, reference_words, 2)
+            scores["rouge_l"] += rouge_l(candidate_words, reference_words)
+            scores["sentence_overlap"] += sentence_overlap(run["sentences"], reference_run["sentences"])
+
+        rows.append({
+            "configuration": name,
+            "settings": configurations[name],
+            "seconds": sum(run["seconds"] for run in runs),
+            "peak_mb": max(run["peak_bytes"] for run in runs) / (1024 * 1024),
+            **{metric: total / len(runs) for metric, total in scores.items()},
+        })
+
+    mark_pareto(rows)
+    rows.sort(key=lambda row: row["seconds"])
+    return {"length": length, "documents": [name for name, _ in corpus], "reference": REFERENCE_CONFIGURATION, "rows": rows}
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        f"{len(report['documents'])} documents, length={report['length']}, reference={report['reference']}",
+        f"{'configuration':<28} {'seconds':>8} {'peak MB':>8} {'ROUGE-1':>8} {'ROUGE-2':>8} {'ROUGE-L':>8} "
+        f"{'overlap':>8} {'pareto':>7}",
+    ]
+    for row in report["rows"]:
+        lines.append(
+            f"{row['configuration']:<28} {row['seconds']:>8.3f} {row['peak_mb']:>8.1f} {row['rouge_1']:>8.3f} "
+            f"{row['rouge_2']:>8.3f} {row['rouge_l']:>8.3f} {row['sentence_overlap']:>8.3f} "
+            f"{'*' if row['pareto_optimal'] else '':>7}"
+        )
+    return "\n".join(lines)
+
+
+def write_csv(report: dict, path: str):
+    fields = ["configuration", "settings", "seconds", "peak_mb", "rouge_1", "rouge_2", "rouge_l",
+              "sentence_overlap", "pareto_optimal"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for row in report["rows"]:
+            writer.writerow({**row, "settings": json.dumps(row["settings"])})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate summarizer configurations for quality vs speed.")
+    parser.add_argument("--length", default="medium", help="Summary length option (very_short, short, medium, long).")
+    parser.add_argument("--configs", help=f"Comma-separated built-in configurations. Available: {', '.join(CONFIGURATIONS)}")
+    parser.add_argument("--config", action="append", default=[], help="Extra configuration as name=JSON kwargs.")
+    parser.add_argument("--json", help="Write the report as JSON to this path.")
+    parser.add_argument("--csv", help="Write the Pareto table as CSV to this path.")
+    args = parser.parse_args()
+
+    selected = CONFIGURATIONS if not args.configs else {name: CONFIGURATIONS[name] for name in args.configs.split(",")}
+    for extra in args.config:
+        name, settings = extra.split("=", 1)
+        selected = {**selected, name: json.loads(settings)}
+
+    report = evaluate(selected, args.length)
+    print(format_table(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(report, args.csv)
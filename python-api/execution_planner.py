@@ -0,0 +1,196 @@
+import math
+import os
+import re
+
+from fastapi import HTTPException, status
+
+from extractive_functions import (
+    APPROXIMATE_SIMILARITY_WINDOW, EXACT_SIMILARITY_SECONDS_PER_PAIR, EXECUTION_MODES, HIERARCHICAL_CHUNK_SENTENCES,
+    HASHING_N_FEATURES, HIERARCHICAL_MAX_CANDIDATES, HashingTFIDFVectorizer, default_k_neighbors, get_vectorizer_class,
+)
+from helper_file_functions import SENTENCE_END_PATTERN
+
+# Picks how a document is summarized from a cheap first pass over its text (sentence, token and vocabulary counts)
+# so that a single large input cannot allocate more memory than the per-request budget allows.
+# Modes are tried from most to least exact (see EXECUTION_MODES); the first that fits the memory budget (and the
+# deadline, when there is one) wins. When none fits, the request is rejected with 413 or, by default, the document
+# is cut to the longest prefix that fits hierarchical execution and the response says so.
+
+# Peak memory allowed for one summarization
+SUMMARY_MEMORY_BUDGET_MB = float(os.getenv("SUMMARY_MEMORY_BUDGET_MB", "512"))
+# "downgrade" summarizes the longest prefix that fits, "reject" returns 413
+SUMMARY_OVERSIZE_POLICY = os.getenv("SUMMARY_OVERSIZE_POLICY", "downgrade")
+
+# --- Cost model (rough figures measured on the sample corpus; tune per deployment) ---
+BYTES_PER_FLOAT = 8
+BYTES_PER_TEXT_CHAR = 3                  # the text plus its sentence list
+BYTES_PER_TOKEN = 80                     # processed token lists (str objects and list slots)
+DENSE_TFIDF_COPIES = 2                   # list of row vectors plus the stacked matrix
+DENSE_SIMILARITY_COPIES = 2              # n x n cosine matrix and the adjacency matrix
+SPARSE_BYTES_PER_NONZERO = 64            # sparse rows plus the inverted index and its sort order
+GRAPH_BYTES_PER_NODE = 300               # networkx node entry
+GRAPH_BYTES_PER_EDGE = 400               # networkx edge entry with its weight dict
+PREPROCESS_SECONDS_PER_TOKEN = 3e-5      # tokenize, POS-tag and lemmatize
+SPARSE_SECONDS_PER_NONZERO = 1e-5        # one posting list lookup in the sparse graph builder
+SPARSE_SECONDS_PER_PAIR = 2e-9           # vectorized accumulate and neighbour selection per sentence pair
+PAGERANK_SECONDS_PER_EDGE_VISIT = 1e-6
+TYPICAL_PAGERANK_ITERATIONS = 30
+HEAPS_EXPONENT = 0.5                     # vocabulary growth when estimating a prefix of the document
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class ExecutionPlan:
+    def __init__(self, mode, sentences, tokens, vocabulary, estimates, budget_bytes, note=None, max_sentences=None):
+        self.mode = mode
+        self.sentences = sentences
+        self.tokens = tokens
+        self.vocabulary = vocabulary
+        self.estimates = estimates            # mode -> {"seconds", "peak_bytes"}
+        self.budget_bytes = budget_bytes
+        self.note = note                      # why the plan is not the dense reference pipeline
+        self.max_sentences = max_sentences    # set when the input was cut to fit the budget
+
+    # Entries for the response's "degradations" list (same style as the deadline degradations)
+    def degradations(self) -> list:
+        degradations = []
+        if self.mode != "dense":
+            degradations.append(f"execution={self.mode}")
+        if self.max_sentences is not None:
+            degradations.append(f"truncated_to_sentences={self.max_sentences}")
+        return degradations
+
+    def as_dict(self) -> dict:
+        estimate = self.estimates[self.mode]
+        return {
+            "mode": self.mode,
+            "sentences": self.sentences,
+            "tokens": self.tokens,
+            "vocabulary": self.vocabulary,
+            "budget_mb": round(self.budget_bytes / (1024 * 1024), 1),
+            "estimated_mb": round(estimate["peak_bytes"] / (1024 * 1024), 1),
+            "estimated_seconds": round(estimate["seconds"], 2),
+            "max_sentences": self.max_sentences,
+            "note": self.note,
+        }
+
+
+def _graph_costs(num_sentences: int):
+    k_neighbors = default_k_neighbors(num_sentences)
+    graph_bytes = num_sentences * GRAPH_BYTES_PER_NODE + num_sentences * k_neighbors * GRAPH_BYTES_PER_EDGE
+    # Each PageRank step visits every neighbour's neighbours; degrees are between k and 2k in a k-NN graph
+    pagerank_seconds = TYPICAL_PAGERANK_ITERATIONS * num_sentences * (1.5 * k_neighbors) ** 2 * PAGERANK_SECONDS_PER_EDGE_VISIT
+    return graph_bytes, pagerank_seconds
+
+
+def _sparse_costs(num_sentences: int, tokens: int, window: int = None):
+    graph_bytes, pagerank_seconds = _graph_costs(num_sentences)
+    compared = num_sentences if window is None else min(num_sentences, 2 * window + 1)
+    peak_bytes = tokens * (BYTES_PER_TOKEN + SPARSE_BYTES_PER_NONZERO) + num_sentences * BYTES_PER_FLOAT + graph_bytes
+    seconds = (tokens * (PREPROCESS_SECONDS_PER_TOKEN + SPARSE_SECONDS_PER_NONZERO)
+               + num_sentences * compared * SPARSE_SECONDS_PER_PAIR + pagerank_seconds)
+    return {"seconds": seconds, "peak_bytes": peak_bytes}
+
+
+def tfidf_width(vocabulary: int, vectorizer_class=None) -> int:
+    # Columns of a dense TF-IDF row: the vocabulary, or the fixed hash space of the hashing vectorizer
+    vectorizer_class = vectorizer_class or get_vectorizer_class()
+    if issubclass(vectorizer_class, HashingTFIDFVectorizer):
+        return HASHING_N_FEATURES
+    return vocabulary
+
+
+def estimate_costs(num_sentences: int, tokens: int, vocabulary: int, text_chars: int = 0,
+                   vectorizer_class=None) -> dict:
+    n = max(num_sentences, 1)
+    text_bytes = text_chars * BYTES_PER_TEXT_CHAR
+    width = tfidf_width(vocabulary, vectorizer_class)
+    graph_bytes, pagerank_seconds = _graph_costs(n)
+
+    dense = {
+        "seconds": tokens * PREPROCESS_SECONDS_PER_TOKEN + n * n * EXACT_SIMILARITY_SECONDS_PER_PAIR + pagerank_seconds,
+        "peak_bytes": (tokens * BYTES_PER_TOKEN + DENSE_TFIDF_COPIES * BYTES_PER_FLOAT * n * width
+                       + DENSE_SIMILARITY_COPIES * BYTES_PER_FLOAT * n * n + graph_bytes),
+    }
+    sparse = _sparse_costs(n, tokens)
+    approximate = _sparse_costs(n, tokens, APPROXIMATE_SIMILARITY_WINDOW)
+
+    # Hierarchical: chunks are ranked one after another, so peak memory is that of the largest stage
+    chunks = math.ceil(n / HIERARCHICAL_CHUNK_SENTENCES)
+    chunk_sentences = min(n, HIERARCHICAL_CHUNK_SENTENCES)
+    chunk_costs = _sparse_costs(chunk_sentences, math.ceil(tokens * chunk_sentences / n))
+    candidates = min(n, max(1, HIERARCHICAL_MAX_CANDIDATES // chunks) * chunks)
+    candidate_costs = _sparse_costs(candidates, math.ceil(tokens * candidates / n))
+    hierarchical = {
+        "seconds": chunks * chunk_costs["seconds"] + candidate_costs["seconds"],
+        "peak_bytes": max(chunk_costs["peak_bytes"], candidate_costs["peak_bytes"]),
+    }
+
+    estimates = {"dense": dense, "sparse": sparse, "approximate": approximate, "hierarchical": hierarchical}
+    for estimate in estimates.values():
+        estimate["peak_bytes"] += text_bytes
+    return estimates
+
+
+def count_input(text: str):
+    # Cheap first pass: -> (sentences, tokens, vocabulary) without tokenizing or tagging
+    words = WORD_PATTERN.findall(text.lower())
+    return max(1, len(SENTENCE_END_PATTERN.findall(text))), len(words), len(set(words))
+
+
+def truncate_to_sentences(text: str, max_sentences: int) -> str:
+    for count, match in enumerate(SENTENCE_END_PATTERN.finditer(text), start=1):
+        if count == max_sentences:
+            return text[:match.end()]
+    return text
+
+
+def plan_execution(text: str, deadline=None, budget_mb: float = None, oversize_policy: str = None,
+                   vectorizer_class=None) -> ExecutionPlan:
+    budget_bytes = (budget_mb or SUMMARY_MEMORY_BUDGET_MB) * 1024 * 1024
+    oversize_policy = oversize_policy or SUMMARY_OVERSIZE_POLICY
+    vectorizer_class = vectorizer_class or get_vectorizer_class()
+    sentences, tokens, vocabulary = count_input(text)
+    estimates = estimate_costs(sentences, tokens, vocabulary, len(text), vectorizer_class)
+
+    fitting = [mode for mode in EXECUTION_MODES if estimates[mode]["peak_bytes"] <= budget_bytes]
+    if fitting:
+        remaining = deadline.remaining() if deadline is not None else math.inf
+        in_time = [mode for mode in fitting if estimates[mode]["seconds"] <= remaining]
+        # Most exact mode that fits both budgets; if none finishes in time, the fastest one that fits in memory
+        mode = in_time[0] if in_time else min(fitting, key=lambda candidate: estimates[candidate]["seconds"])
+        note = None
+        if mode != "dense":
+            dense = estimates["dense"]
+            reason = (f"dense execution needs ~{dense['peak_bytes'] / (1024 * 1024):.0f} MB of the "
+                      f"{budget_bytes / (1024 * 1024):.0f} MB budget" if "dense" not in fitting
+                      else f"dense execution needs ~{dense['seconds']:.1f}s of the {remaining:.1f}s left")
+            note = f"Using {mode} execution for {sentences} sentences: {reason}."
+        return ExecutionPlan(mode, sentences, tokens, vocabulary, estimates, budget_bytes, note)
+
+    cheapest = min(estimates.values(), key=lambda estimate: estimate["peak_bytes"])
+    if oversize_policy == "reject":
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=(f"Input has ~{sentences} sentences and ~{tokens} words; summarizing it needs at least "
+                    f"~{cheapest['peak_bytes'] / (1024 * 1024):.0f} MB, over the "
+                    f"{budget_bytes / (1024 * 1024):.0f} MB limit. Send a shorter text or a page range.")
+        )
+
+    # Downgrade: the longest prefix whose hierarchical estimate fits (binary search on the sentence count)
+    low, high = 1, sentences
+    while low < high:
+        middle = (low + high + 1) // 2
+        share = middle / sentences
+        prefix = estimate_costs(middle, math.ceil(tokens * share), math.ceil(vocabulary * share ** HEAPS_EXPONENT),
+                                math.ceil(len(text) * share), vectorizer_class)
+        if prefix["hierarchical"]["peak_bytes"] <= budget_bytes:
+            low = middle
+        else:
+            high = middle - 1
+    share = low / sentences
+    estimates = estimate_costs(low, math.ceil(tokens * share), math.ceil(vocabulary * share ** HEAPS_EXPONENT),
+                               math.ceil(len(text) * share), vectorizer_class)
+    note = (f"Input exceeds the {budget_bytes / (1024 * 1024):.0f} MB memory budget: "
+            f"summarized the first {low} of ~{sentences} sentences with hierarchical execution.")
+    return ExecutionPlan("hierarchical", sentences, tokens, vocabulary, estimates, budget_bytes, note, max_sentences=low)
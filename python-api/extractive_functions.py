@@ -1,5 +1,9 @@
 import string
 import math
+import hashlib
+import os
+import threading
+import zlib
 from collections import Counter
 from collections import defaultdict
 import numpy as np
@@ -11,9 +15,56 @@ import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import wordnet
-from nltk.tokenize import sent_tokenize
 from nltk.tokenize import word_tokenize
 
+from sentence_segmenters import get_segmenter
+from deadline import DeadlineExceeded
+from memo_cache import LRUCache
+from parallel_preprocessing import PARALLEL_PREPROCESS_MIN_SENTENCES, get_preprocessing_pool
+
+# Shared, read-only preprocessing resources (built once instead of per sentence)
+EMOJI_PATTERN = re.compile(
+    "["
+    u"\U0001F600-\U0001F64F"  # Emoticons
+    u"\U0001F300-\U0001F5FF"  # Symbols & Pictographs
+    u"\U0001F680-\U0001F6FF"  # Transport & Map Symbols
+    u"\U0001F700-\U0001F77F"  # Alchemical Symbols
+    u"\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
+    u"\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
+    u"\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
+    u"\U0001FA00-\U0001FA6F"  # Chess Symbols, etc.
+    u"\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
+    u"\U00002702-\U000027B0"  # Dingbats
+    u"\U000024C2-\U0001F251"
+    "]+",
+    flags=re.UNICODE
+)
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7F]+')
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+LEMMATIZER = WordNetLemmatizer()
+_stop_words = None
+_shared_resources_lock = threading.Lock()
+
+# NLTK corpora load lazily and their first load is not thread-safe, so the shared, read-only resources
+# are loaded once under a lock before any thread uses them.
+def get_stop_words():
+    global _stop_words
+    if _stop_words is None:
+        with _shared_resources_lock:
+            if _stop_words is None:
+                wordnet.ensure_loaded()
+                _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+# Memoized preprocessing shared by all requests in the process (sizes are entry counts, 0 disables)
+# (word, wordnet POS) -> lemma
+LEMMA_CACHE = LRUCache(int(os.getenv("LEMMA_CACHE_SIZE", "100000")), name="lemma")
+# hash of the normalized sentence -> tuple of processed tokens
+SENTENCE_CACHE = LRUCache(int(os.getenv("SENTENCE_CACHE_SIZE", "50000")), name="sentence")
+
+def get_preprocessing_cache_stats():
+    return {cache.name: cache.stats() for cache in (SENTENCE_CACHE, LEMMA_CACHE)}
+
 class TFIDFVectorizer:
     def __init__(self, norm='l2'):
         self.corpus_word_counts = {}  # Stores word counts per document (for TF)
@@ -22,6 +73,7 @@ class TFIDFVectorizer:
         self.num_documents = 0
         self.word_to_idx = {}         # Mapping of word to its index in the vocabulary
         self.norm = norm
+        self._processed_cache = None  # (documents, preprocessed tokens) from the last fit, reused by transform
 
     def get_wordnet_pos(self, treebank_tag):
         if treebank_tag.startswith('J'):  # Adjective
@@ -38,76 +90,114 @@ class TFIDFVectorizer:
         
     def remove_emojis_and_symbols(self, text):
         # Remove emojis and symbols (anything that's not basic punctuation, letters, or digits)
-        emoji_pattern = re.compile(
-            "["
-            u"\U0001F600-\U0001F64F"  # Emoticons
-            u"\U0001F300-\U0001F5FF"  # Symbols & Pictographs
-            u"\U0001F680-\U0001F6FF"  # Transport & Map Symbols
-            u"\U0001F700-\U0001F77F"  # Alchemical Symbols
-            u"\U0001F780-\U0001F7FF"  # Geometric Shapes Extended
-            u"\U0001F800-\U0001F8FF"  # Supplemental Arrows-C
-            u"\U0001F900-\U0001F9FF"  # Supplemental Symbols and Pictographs
-            u"\U0001FA00-\U0001FA6F"  # Chess Symbols, etc.
-            u"\U0001FA70-\U0001FAFF"  # Symbols and Pictographs Extended-A
-            u"\U00002702-\U000027B0"  # Dingbats
-            u"\U000024C2-\U0001F251"
-            "]+",
-            flags=re.UNICODE
-        )
-        text = emoji_pattern.sub(r'', text)
+        text = EMOJI_PATTERN.sub(r'', text)
 
         # Remove non-ASCII characters (optional, for symbols like ©, ™)
-        text = re.sub(r'[^\x00-\x7F]+', '', text)
+        text = NON_ASCII_PATTERN.sub('', text)
 
         return text
 
-    def preprocess_text(self, input_text):
+    def _normalize(self, input_text):
         input_text = input_text.lower()
 
         # Remove emojis and symbols
         input_text = self.remove_emojis_and_symbols(input_text)
 
         # Remove punctuations
-        normalized_sentence = input_text.translate(str.maketrans('', '', string.punctuation))
+        return input_text.translate(PUNCTUATION_TABLE)
+
+    def _tokenize_normalized(self, normalized_sentence):
         words = word_tokenize(normalized_sentence)
 
         # Remove stopWords
-        stop_words = set(stopwords.words('english'))
-        tokens = [word for word in words if word not in stop_words]
+        stop_words = get_stop_words()
+        return [word for word in words if word not in stop_words]
 
-        # Lemmatization
-        lemmatizer = WordNetLemmatizer()
-        tagged_tokens = nltk.pos_tag(tokens)
+    def _lemmatize_tagged(self, tagged_tokens):
         lemmatized_words = []
         for word, tag in tagged_tokens:
             pos = self.get_wordnet_pos(tag)
-            if pos:  
-                lemma = lemmatizer.lemmatize(word, pos=pos)
-            else: 
-                lemma = lemmatizer.lemmatize(word)
+            lemma = LEMMA_CACHE.get((word, pos))
+            if lemma is None:
+                if pos:  
+                    lemma = LEMMATIZER.lemmatize(word, pos=pos)
+                else: 
+                    lemma = LEMMATIZER.lemmatize(word)
+                LEMMA_CACHE.put((word, pos), lemma)
             lemmatized_words.append(lemma)
-            
         return lemmatized_words
 
+    # Tokenizes every document, POS-tags them all in one batched call and lemmatizes the result.
+    # Sentences seen before (after normalization) are served from SENTENCE_CACHE and skip tagging entirely.
+    def preprocess_documents(self, documents):
+        get_stop_words()  # loads the shared NLTK resources before any tokenizing or lemmatizing
+        processed_documents = [None] * len(documents)
+        missed_keys = {}  # sentence key -> positions, so duplicates within a corpus are processed once
+        missed_sentences = []
+
+        for position, document in enumerate(documents):
+            normalized_sentence = self._normalize(document)
+            key = hashlib.blake2b(normalized_sentence.encode('utf-8'), digest_size=16).digest()
+            cached_tokens = SENTENCE_CACHE.get(key)
+            if cached_tokens is not None:
+                processed_documents[position] = list(cached_tokens)
+            elif key in missed_keys:
+                missed_keys[key].append(position)
+            else:
+                missed_keys[key] = [position]
+                missed_sentences.append(normalized_sentence)
+
+        # Long documents are split across the warm worker pool; short ones are not worth the hand-off
+        pool = get_preprocessing_pool() if len(missed_sentences) >= PARALLEL_PREPROCESS_MIN_SENTENCES else None
+        if pool is not None:
+            missed_tokens = pool.process(missed_sentences)
+        else:
+            missed_tokens = self.process_normalized(missed_sentences)
+
+        for (key, positions), lemmatized_words in zip(missed_keys.items(), missed_tokens):
+            SENTENCE_CACHE.put(key, tuple(lemmatized_words))
+            for position in positions:
+                processed_documents[position] = list(lemmatized_words)
+
+        return processed_documents
+
+    # Tokenizes, batch POS-tags and lemmatizes already normalized sentences (no sentence cache involved)
+    def process_normalized(self, normalized_sentences):
+        get_stop_words()
+        token_lists = [self._tokenize_normalized(sentence) for sentence in normalized_sentences]
+        tagged_documents = nltk.pos_tag_sents(token_lists)
+        return [self._lemmatize_tagged(tagged_tokens) for tagged_tokens in tagged_documents]
+
+    def preprocess_text(self, input_text):
+        return self.preprocess_documents([input_text])[0]
+
+    # Returns preprocessed tokens for the documents, reusing the result from fit when transform sees the same corpus.
+    def _get_processed_documents(self, documents):
+        documents = list(documents)
+        if self._processed_cache is not None and self._processed_cache[0] == documents:
+            return self._processed_cache[1]
+        processed_documents = self.preprocess_documents(documents)
+        self._processed_cache = (documents, processed_documents)
+        return processed_documents
+
     # Learns the vocabulary and document frequencies from the given corpus.
     def fit(self, corpus):
         self.num_documents = len(corpus)
+        self.corpus_word_counts = {}
+        self.document_frequency = {}
+        vocabulary = set()
 
-        for doc_id, document in enumerate(corpus):
-            processed_tokens = self.preprocess_text(document) 
-
+        for doc_id, processed_tokens in enumerate(self._get_processed_documents(corpus)):
             # Update vocabulary and document frequency
-            unique_words_in_doc = set()
-            for word in processed_tokens:
-                self.vocabulary.add(word)
-                unique_words_in_doc.add(word)
+            unique_words_in_doc = set(processed_tokens)
+            vocabulary.update(unique_words_in_doc)
 
             for word in unique_words_in_doc:
                 self.document_frequency[word] = self.document_frequency.get(word, 0) + 1
 
             self.corpus_word_counts[doc_id] = Counter(processed_tokens)
 
-        self.vocabulary = sorted(list(self.vocabulary))
+        self.vocabulary = sorted(vocabulary)
         self.word_to_idx = {word: idx for idx, word in enumerate(self.vocabulary)}
 
     def _calculate_idf(self, word):
@@ -119,29 +209,20 @@ class TFIDFVectorizer:
     def transform(self, documents):
         tfidf_matrix = []
 
-        temp_document_word_counts = {}
-        for temp_doc_id, document in enumerate(documents):
-            processed_tokens = self.preprocess_text(document)
-            temp_document_word_counts[temp_doc_id] = Counter(processed_tokens)
+        for processed_tokens in self._get_processed_documents(documents):
+            word_counts = Counter(processed_tokens)
+            total_words_in_current_doc = len(processed_tokens)
 
             # Initialize a NumPy array for the current document with zeros
             tfidf_vector = np.zeros(len(self.vocabulary))
 
             # Calculate TF-IDF for each word in the current document
-            for word in processed_tokens:
+            for word, current_doc_word_count in word_counts.items():
                 if word in self.word_to_idx:  # Ensure word is in our learned vocabulary
                     # Term Frequency calculation for the current document
-                    current_doc_word_count = temp_document_word_counts[temp_doc_id].get(word, 0)
-                    total_words_in_current_doc = sum(temp_document_word_counts[temp_doc_id].values())
-
-                    if total_words_in_current_doc == 0:
-                        tf = 0.0
-                    else:
-                        tf = current_doc_word_count / total_words_in_current_doc
-
+                    tf = current_doc_word_count / total_words_in_current_doc
                     idf = self._calculate_idf(word)
-                    tfidf_score = tf * idf
-                    tfidf_vector[self.word_to_idx[word]] = tfidf_score
+                    tfidf_vector[self.word_to_idx[word]] = tf * idf
 
             # Apply L2 normalization
             if self.norm == 'l2':
@@ -153,6 +234,7 @@ class TFIDFVectorizer:
         return np.array(tfidf_matrix)  
 
     # Fits the vectorizer to the corpus and then transforms the corpus into TF-IDF vectors.
+    # The corpus is preprocessed once and shared between fit and transform.
     def fit_transform(self, corpus):
         if isinstance(corpus, str):
             # If a single string, wrap it in a list to treat as one document for fitting
@@ -161,27 +243,343 @@ class TFIDFVectorizer:
             documents = corpus 
 
         self.fit(documents)
-        return self.transform(documents)
+        tfidf_matrix = self.transform(documents)
+        self._processed_cache = None
+        return tfidf_matrix
+
+    # Like fit_transform, but returns one (sorted feature indices, values) pair per document instead of a dense
+    # documents x vocabulary matrix, so memory follows the number of non-zero entries.
+    def fit_transform_sparse(self, corpus):
+        documents = [corpus] if isinstance(corpus, str) else corpus
+        self.fit(documents)
+        rows = []
+        for processed_tokens in self._get_processed_documents(documents):
+            word_counts = Counter(processed_tokens)
+            indices = np.array(sorted(self.word_to_idx[word] for word in word_counts), dtype=np.int64)
+            values = np.array([
+                word_counts[self.vocabulary[idx]] / len(processed_tokens) * self._calculate_idf(self.vocabulary[idx])
+                for idx in indices
+            ], dtype=float)
+            norm_val = np.linalg.norm(values)
+            if self.norm == 'l2' and norm_val > 0:
+                values = values / norm_val
+            rows.append((indices, values))
+        self._processed_cache = None
+        return rows
+
+    # Feature index -> readable word, used for keyword extraction
+    def index_to_word(self):
+        return {idx: word for word, idx in self.word_to_idx.items()}
+
+
+# --- Hashing vectorizer settings ---
+HASHING_N_FEATURES = int(os.getenv("HASHING_N_FEATURES", "4096"))             # fixed vector dimension
+HASHING_REVERSE_MAP_SIZE = int(os.getenv("HASHING_REVERSE_MAP_SIZE", "256"))  # readable words kept for keywords
+
+
+class HashingTFIDFVectorizer(TFIDFVectorizer):
+    # TF-IDF over a fixed number of hashed features instead of a learned vocabulary, so memory does not grow with
+    # the vocabulary. Each word maps to a bucket and a sign; with signed hashing, colliding words cancel out in
+    # expectation instead of piling up. Sentences can be added in batches as they arrive (partial_fit), and the
+    # per-bucket document frequencies for IDF are collected in that same pass.
+    # Only one word per bucket is remembered while streaming, and only the top buckets are kept after vectorizing,
+    # which is enough to report readable keywords.
+
+    def __init__(self, norm='l2', n_features=None, use_idf=True, reverse_map_size=None):
+        super().__init__(norm=norm)
+        self.n_features = n_features or HASHING_N_FEATURES
+        self.use_idf = use_idf
+        self.reverse_map_size = reverse_map_size if reverse_map_size is not None else HASHING_REVERSE_MAP_SIZE
+        self.reset()
+
+    def reset(self):
+        self.num_documents = 0
+        self.bucket_document_frequency = np.zeros(self.n_features, dtype=np.int64)
+        self._rows = []           # per document: (bucket indices, signed term frequencies)
+        self._bucket_words = {}   # bucket -> [most frequent word seen in it, its count]
+
+    def _hash(self, word):
+        hashed = zlib.crc32(word.encode('utf-8'))
+        return hashed % self.n_features, (-1.0 if hashed & 0x80000000 else 1.0)
+
+    def _hash_document(self, processed_tokens, remember_words=False):
+        row = {}
+        for word, count in Counter(processed_tokens).items():
+            bucket, sign = self._hash(word)
+            row[bucket] = row.get(bucket, 0.0) + sign * count / len(processed_tokens)
+            if remember_words:
+                resident = self._bucket_words.get(bucket)
+                if resident is None or (resident[0] != word and count > resident[1]):
+                    self._bucket_words[bucket] = [word, count]
+                elif resident[0] == word:
+                    resident[1] += count
+        return (np.fromiter(row.keys(), dtype=np.int64, count=len(row)),
+                np.fromiter(row.values(), dtype=float, count=len(row)))
+
+    # Adds a batch of documents (e.g. the sentences of one extracted page) to the single pass over the text.
+    def partial_fit(self, documents):
+        for processed_tokens in self.preprocess_documents(list(documents)):
+            buckets, values = self._hash_document(processed_tokens, remember_words=True)
+            self.bucket_document_frequency[buckets] += 1
+            self.num_documents += 1
+            self._rows.append((buckets, values))
+        return self
+
+    def fit(self, corpus):
+        self.reset()
+        return self.partial_fit(corpus)
+
+    def _weighted_rows(self, rows):
+        # 'smooth IDF' per bucket, as in _calculate_idf
+        idf = np.log((self.num_documents + 1) / (self.bucket_document_frequency + 1)) + 1 if self.use_idf else None
+        weighted_rows = []
+        for buckets, values in rows:
+            if idf is not None:
+                values = values * idf[buckets]
+            if self.norm == 'l2':
+                norm_val = np.linalg.norm(values)
+                if norm_val > 0:
+                    values = values / norm_val
+            order = np.argsort(buckets)
+            weighted_rows.append((buckets[order], values[order]))
+        return weighted_rows
+
+    def _to_matrix(self, rows):
+        tfidf_matrix = np.zeros((len(rows), self.n_features))
+        for i, (buckets, values) in enumerate(self._weighted_rows(rows)):
+            tfidf_matrix[i, buckets] = values
+        return tfidf_matrix
+
+    def _prune_reverse_map(self, weighted_rows):
+        if len(self._bucket_words) <= self.reverse_map_size:
+            return
+        bucket_scores = np.zeros(self.n_features)
+        for buckets, values in weighted_rows:
+            np.maximum.at(bucket_scores, buckets, np.abs(values))
+        top_buckets = sorted(self._bucket_words, key=lambda bucket: bucket_scores[bucket], reverse=True)
+        self._bucket_words = {bucket: self._bucket_words[bucket] for bucket in top_buckets[:self.reverse_map_size]}
+
+    # Vectors for every document added so far; keeps the reverse map to the highest-scoring buckets only.
+    def vectors(self):
+        self._prune_reverse_map(self._weighted_rows(self._rows))
+        return self._to_matrix(self._rows)
+
+    # Sparse form of vectors(): one (sorted bucket indices, values) pair per document
+    def sparse_vectors(self):
+        weighted_rows = self._weighted_rows(self._rows)
+        self._prune_reverse_map(weighted_rows)
+        return weighted_rows
+
+    def fit_transform_sparse(self, corpus):
+        self.fit([corpus] if isinstance(corpus, str) else corpus)
+        return self.sparse_vectors()
+
+    # Vectorizes new documents with the document frequencies collected so far (does not add them to the corpus).
+    def transform(self, documents):
+        return self._to_matrix([self._hash_document(tokens) for tokens in self.preprocess_documents(list(documents))])
+
+    def fit_transform(self, corpus):
+        self.fit([corpus] if isinstance(corpus, str) else corpus)
+        return self.vectors()
+
+    def index_to_word(self):
+        return {bucket: word for bucket, (word, count) in self._bucket_words.items()}
+
+
+# TF-IDF backends by name; "vocabulary" learns the exact vocabulary, "hashing" uses fixed-size hashed features
+VECTORIZERS = {
+    "vocabulary": TFIDFVectorizer,
+    "hashing": HashingTFIDFVectorizer,
+}
+
+# Deployment-wide default
+DEFAULT_VECTORIZER = os.getenv("TFIDF_VECTORIZER", "vocabulary")
+
+
+def get_vectorizer_class(name=None):
+    vectorizer_name = (name or DEFAULT_VECTORIZER).lower().strip()
+    if vectorizer_name not in VECTORIZERS:
+        raise ValueError(
+            f"Unknown TF-IDF vectorizer: {vectorizer_name}. Available: {', '.join(sorted(VECTORIZERS))}"
+        )
+    return VECTORIZERS[vectorizer_name]
+
+
+SUMMARY_LENGTH_OPTIONS = ("very_short", "short", "medium", "long")
+
+# --- Deadline degradation settings ---
+# Applied progressively as the remaining share of a request's time budget shrinks
+DEGRADE_K_NEIGHBORS_BELOW = 0.6            # remaining fraction below which k_neighbors is reduced
+DEGRADED_K_NEIGHBORS = 2
+DEGRADE_PAGERANK_BELOW = 0.4               # remaining fraction below which PageRank iterations are capped
+DEGRADED_PAGERANK_ITERATIONS = 10
+DEGRADE_SIMILARITY_BELOW = 0.25            # remaining fraction below which similarity is approximated
+APPROXIMATE_SIMILARITY_WINDOW = 20         # compare each sentence only with its nearest neighbours by position
+EXACT_SIMILARITY_SECONDS_PER_PAIR = 5e-6   # rough cost of one exact cosine similarity in _build_graph
+
+# --- Execution modes (chosen per document by execution_planner) ---
+# dense: documents x vocabulary TF-IDF matrix and an n x n similarity matrix (the reference pipeline)
+# sparse: sparse TF-IDF rows and exact similarities from an inverted index, one row at a time
+# approximate: sparse rows, compared only with sentences within the similarity window
+# hierarchical: sparse ranking per chunk of sentences, then a global ranking of the chunk winners
+EXECUTION_MODES = ("dense", "sparse", "approximate", "hierarchical")
+HIERARCHICAL_CHUNK_SENTENCES = 1000        # sentences ranked together in the first hierarchical stage
+HIERARCHICAL_MAX_CANDIDATES = 1000         # chunk winners ranked together in the second stage
+
+
+# Neighbour count used when k_neighbors is not configured, chosen by document size
+def default_k_neighbors(num_docs):
+    if num_docs <= 15:
+        return 2
+    elif num_docs <= 100:
+        return 5
+    return 10
+
+
+# Number of summary sentences for a document of original_sentence_count sentences at the requested length
+def get_summary_sentence_count(original_sentence_count, selectedOptionValue):
+    summary_option = selectedOptionValue.lower().strip() # Normalize input
+
+    num_of_sentences = 0 # Initialize the variable
+
+    # --- Document Length Tiers ---
+    if 1 <= original_sentence_count <= 20:
+        # Tier 1: Very Short Documents
+        if summary_option == "very_short":
+            num_of_sentences = min(2, original_sentence_count) # Max 2, but not more than original
+            num_of_sentences = max(1, num_of_sentences) # Ensure at least 1
+        elif summary_option == "short":
+            num_of_sentences = min(4, original_sentence_count)
+            num_of_sentences = max(3, num_of_sentences)
+        elif summary_option == "medium":
+            num_of_sentences = min(7, original_sentence_count)
+            num_of_sentences = max(5, num_of_sentences)
+        elif summary_option == "long":
+            num_of_sentences = min(10, original_sentence_count) # Cap at 10, or up to 50%
+            # For "long" in very short documents, a higher percentage might be implied.
+            # Let's say up to 50% but not more than 10.
+            percentage_based = int(original_sentence_count * 0.5)
+            num_of_sentences = min(max(10, percentage_based), original_sentence_count)
+            num_of_sentences = max(8, num_of_sentences) # Ensure at least 8
+
+    elif 21 <= original_sentence_count <= 100:
+        # Tier 2: Short to Medium Documents
+        if summary_option == "very_short":
+            num_of_sentences = min(3, original_sentence_count) # Fixed min for very short
+        elif summary_option == "short":
+            num_of_sentences = max(5, int(original_sentence_count * 0.08)) # Min 5, or 8%
+        elif summary_option == "medium":
+            num_of_sentences = max(8, int(original_sentence_count * 0.15)) # Min 8, or 15%
+        elif summary_option == "long":
+            num_of_sentences = max(15, int(original_sentence_count * 0.25)) # Min 15, or 25%
+
+    elif 101 <= original_sentence_count <= 500:
+        # Tier 3: Medium to Long Documents
+        if summary_option == "very_short":
+            num_of_sentences = min(5, original_sentence_count) # Fixed min for very short
+        elif summary_option == "short":
+            num_of_sentences = int(original_sentence_count * 0.08) # 8%
+        elif summary_option == "medium":
+            num_of_sentences = int(original_sentence_count * 0.15) # 15%
+        elif summary_option == "long":
+            num_of_sentences = int(original_sentence_count * 0.25) # 25%
+
+    elif original_sentence_count > 500:
+        # Tier 4: Very Long Documents
+        if summary_option == "very_short":
+            num_of_sentences = min(7, original_sentence_count) # Fixed min for very short
+        elif summary_option == "short":
+            num_of_sentences = int(original_sentence_count * 0.05) # 5%
+        elif summary_option == "medium":
+            num_of_sentences = int(original_sentence_count * 0.10) # 10%
+        elif summary_option == "long":
+            # 18% with an optional hard cap, e.g., max 150 sentences
+            num_of_sentences = min(int(original_sentence_count * 0.18), 150) # Cap at 150 for "long"
+                
+    # Ensure minimum of 1 sentence for any valid input, unless original is 0.
+    if num_of_sentences == 0 and original_sentence_count > 0:
+        # Fallback for unexpected summary_option or edge cases
+        num_of_sentences = 1
+
+    # Ensure it doesn't exceed the original sentence count
+    num_of_sentences = min(num_of_sentences, original_sentence_count)
+    # Ensure at least 1 sentence if original had sentences
+    if original_sentence_count > 0 and num_of_sentences == 0:
+        num_of_sentences = 1
+
+    return num_of_sentences
+
+
+# Picks the top-ranked sentences for the requested length and returns them in their original order
+def build_summary(sentences, ranked_indices, selectedOptionValue):
+    if not ranked_indices:
+        return "Could not generate a summary. The input text might be too short or too similar."
+
+    original_sentence_count = len(sentences)
+    if original_sentence_count <= 0:
+        return "Sentence count is zero"
+
+    final_num_sentences = get_summary_sentence_count(original_sentence_count, selectedOptionValue)
+    # Extract the top-ranked sentences in their original order
+    extracted_sentence_indices = sorted(ranked_indices[:final_num_sentences])
+    
+    summary_sentences = [sentences[idx] for idx in extracted_sentence_indices]
+    return " ".join(summary_sentences)
+
+
+# Everything one ranking run produces. A new result is built per call, so concurrent rankings never share state.
+class RankingResult:
+    def __init__(self, sentences, ranked_indices, sentence_scores=None, tfidf_vectors=None, vectorizer=None, graph=None,
+                 settings=None, tfidf_rows=None):
+        self.sentences = sentences
+        self.ranked_indices = ranked_indices
+        self.sentence_scores = sentence_scores if sentence_scores is not None else {}
+        self.tfidf_vectors = tfidf_vectors  # dense matrix; None for sparse execution or a position-based ranking
+        self.tfidf_rows = tfidf_rows        # (feature indices, values) per sentence for sparse execution
+        self.vectorizer = vectorizer        # the fitted TFIDFVectorizer behind the vectors
+        self.graph = graph
+        self.settings = settings if settings is not None else {}  # effective execution/k_neighbors/max_iterations/similarity_window
+
+    def summary_for_option(self, selectedOptionValue):
+        return build_summary(self.sentences, self.ranked_indices, selectedOptionValue)
+
+    # (feature indices, scores) per vectorized sentence, for dense and sparse execution alike
+    def feature_rows(self):
+        if self.tfidf_rows is not None:
+            return self.tfidf_rows
+        if self.tfidf_vectors is None:
+            return []
+        rows = []
+        for vector in self.tfidf_vectors:
+            indices = np.flatnonzero(np.abs(vector) > 1e-9)
+            rows.append((indices, vector[indices]))
+        return rows
 
 
 class TextRankSummarizer:
-    def __init__(self, k_neighbors=None, damping_factor=0.85, max_iterations=100, tolerance=1e-4):
-        # k_neighbors (int): The number of most similar neighbors to connect to each sentence.
+    # Holds configuration only: rank() and summarize() keep per-document state in locals and the returned
+    # RankingResult, so one instance can serve any number of threads at once.
+    def __init__(self, k_neighbors=None, damping_factor=0.85, max_iterations=100, tolerance=1e-4, segmenter=None,
+                 similarity_window=None, vectorizer_class=None, execution="dense"):
+        # k_neighbors (int): The number of most similar neighbors to connect to each sentence; None picks by document size.
         # damping_factor (float): The damping factor for the PageRank algorithm (typically 0.85).
         # max_iterations (int): Maximum number of PageRank iterations.
         # tolerance (float): Convergence tolerance for PageRank.
+        # segmenter (str): Sentence segmenter backend name ("punkt", "regex"); None uses the deployment default.
+        # similarity_window (int): Approximate similarity; only compare sentences within this many positions.
+        # vectorizer_class: Factory for the per-call TF-IDF vectorizer; None uses the deployment default (TFIDF_VECTORIZER).
+        # execution (str): One of EXECUTION_MODES; see execution_planner for how it is chosen.
         
+        if execution not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {execution}. Available: {', '.join(EXECUTION_MODES)}")
+        self.execution = execution
+        self.segment_sentences = get_segmenter(segmenter)
+        self.similarity_window = similarity_window
         self.k_neighbors = k_neighbors
         self.damping_factor = damping_factor
         self.max_iterations = max_iterations
         self.tolerance = tolerance
-        
-        self.sentences = []
-        self.preprocessed_sentences = []
-        self.tfidf_vectors = None
-        self.sentence_scores = None
-        self.graph = None
-        self.tfidf_vectorizer = TFIDFVectorizer(norm='l2')
+        self.vectorizer_class = vectorizer_class or get_vectorizer_class()
 
     def manual_cosine_similarity(self, vec1, vec2):
         dot_product = np.dot(vec1, vec2)
@@ -194,7 +592,7 @@ class TextRankSummarizer:
         return dot_product / (norm_vec1 * norm_vec2)
 
 
-    def _build_graph(self, tfidf_vectors):
+    def _build_graph(self, tfidf_vectors, k_neighbors=None, similarity_window=None, deadline=None):
         num_docs = tfidf_vectors.shape[0]
         if num_docs == 0:
             # print("No documents to build graph from.")
@@ -204,27 +602,27 @@ class TextRankSummarizer:
 
         # Calculate the full cosine similarity matrix
         cosine_sim_matrix = np.zeros((num_docs, num_docs))
-        for i in range(num_docs):
-            for j in range(num_docs):
-                cosine_sim_matrix[i, j] = self.manual_cosine_similarity(tfidf_vectors[i], tfidf_vectors[j])
+        if similarity_window is not None:
+            # Approximate: rows are L2-normalized, so cosine similarity is a dot product within the window
+            for i in range(num_docs):
+                lo = max(0, i - similarity_window)
+                hi = min(num_docs, i + similarity_window + 1)
+                cosine_sim_matrix[i, lo:hi] = tfidf_vectors[lo:hi] @ tfidf_vectors[i]
+        else:
+            for i in range(num_docs):
+                if deadline is not None:
+                    deadline.check()
+                for j in range(num_docs):
+                    cosine_sim_matrix[i, j] = self.manual_cosine_similarity(tfidf_vectors[i], tfidf_vectors[j])
 
         # print("\n--- Full Cosine Similarity Matrix ---")
         cosine_sim_df = pd.DataFrame(cosine_sim_matrix, index=doc_labels, columns=doc_labels)
         # print(cosine_sim_df.round(4))
         # print("-" * 50)
         
-        if self.k_neighbors is None:
-            if num_docs <= 15:
-                k_neighbors_effective = 2
-                self.k_neighbors = 2
-            elif num_docs > 15 and num_docs <= 100:
-                k_neighbors_effective = 5
-                self.k_neighbors = 5
-            elif num_docs > 100:
-                k_neighbors_effective = 10
-                self.k_neighbors = 10
-        else:
-            k_neighbors_effective = self.k_neighbors
+        if k_neighbors is None:
+            k_neighbors = default_k_neighbors(num_docs)
+        k_neighbors_effective = k_neighbors
         
         k_neighbors_effective = min(k_neighbors_effective, num_docs - 1)
         if k_neighbors_effective < 0: # Handle case of single document
@@ -310,7 +708,57 @@ class TextRankSummarizer:
         return G_relative
 
 
-    def _pagerank(self, graph):
+    # Sparse counterpart of _build_graph: exact cosine similarities (rows are L2-normalized) accumulated through an
+    # inverted index one sentence at a time, so neither a dense TF-IDF matrix nor an n x n matrix is allocated.
+    # With similarity_window only sentences within that many positions are compared.
+    def _build_sparse_graph(self, tfidf_rows, k_neighbors=None, similarity_window=None, deadline=None):
+        num_docs = len(tfidf_rows)
+        graph = nx.Graph()
+        doc_labels = [f"Sentence {i+1}" for i in range(num_docs)]
+        graph.add_nodes_from(doc_labels)
+        if num_docs == 0:
+            return graph
+
+        if k_neighbors is None:
+            k_neighbors = default_k_neighbors(num_docs)
+        k_neighbors_effective = max(0, min(k_neighbors, num_docs - 1))
+        if k_neighbors_effective == 0:
+            return graph
+
+        # Postings: for each feature, the sentences containing it (ascending) and their weights
+        lengths = [len(indices) for indices, values in tfidf_rows]
+        if sum(lengths) == 0:
+            return graph
+        posting_docs = np.repeat(np.arange(num_docs), lengths)
+        posting_features = np.concatenate([indices for indices, values in tfidf_rows])
+        posting_values = np.concatenate([values for indices, values in tfidf_rows])
+        order = np.argsort(posting_features, kind='stable')
+        posting_docs, posting_features, posting_values = posting_docs[order], posting_features[order], posting_values[order]
+
+        for i, (indices, values) in enumerate(tfidf_rows):
+            if deadline is not None:
+                deadline.check()
+            lo = 0 if similarity_window is None else max(0, i - similarity_window)
+            hi = num_docs if similarity_window is None else min(num_docs, i + similarity_window + 1)
+            similarities = np.zeros(hi - lo)
+            starts = np.searchsorted(posting_features, indices, side='left')
+            ends = np.searchsorted(posting_features, indices, side='right')
+            for value, start, end in zip(values, starts, ends):
+                docs = posting_docs[start:end]
+                if similarity_window is not None:
+                    start, end = start + np.searchsorted(docs, lo), start + np.searchsorted(docs, hi)
+                    docs = posting_docs[start:end]
+                similarities[docs - lo] += value * posting_values[start:end]
+
+            similarities[i - lo] = -1.0  # never pick itself
+            for neighbor in np.argsort(similarities)[-k_neighbors_effective:]:
+                similarity = similarities[neighbor]
+                neighbor_idx = int(neighbor) + lo
+                if similarity > 1e-9 and not graph.has_edge(doc_labels[i], doc_labels[neighbor_idx]):
+                    graph.add_edge(doc_labels[i], doc_labels[neighbor_idx], weight=float(similarity))
+        return graph
+
+    def _pagerank(self, graph, max_iterations=None, deadline=None):
         num_nodes = graph.number_of_nodes()
         if num_nodes == 0:
             return {}
@@ -318,7 +766,9 @@ class TextRankSummarizer:
         # Initialize scores equally
         scores = {node: 1.0 / num_nodes for node in graph.nodes()}
 
-        for iteration in range(self.max_iterations):
+        for iteration in range(max_iterations if max_iterations is not None else self.max_iterations):
+            if deadline is not None:
+                deadline.check_cancelled()
             new_scores = {}
             total_score_sum = 0 
 
@@ -357,21 +807,119 @@ class TextRankSummarizer:
         # # print(f"PageRank finished after {iteration + 1} iterations.")
         return scores
 
-    def summarize(self, text, num_sentences=None, ratio=None, selectedOptionValue=None):
-        self.sentences = sent_tokenize(text) 
-        self.tfidf_vectors = self.tfidf_vectorizer.fit_transform(self.sentences)
-        self.graph = self._build_graph(self.tfidf_vectors)
-        self.sentence_scores = self._pagerank(self.graph)
-        
-        if not self.sentence_scores:
-            return "Could not generate a summary. The input text might be too short or too similar."
+    # Settings for the remaining stages: the configured ones, cheapened as the deadline approaches.
+    # Returned per call (never written back to the instance) so degradations cannot leak between requests.
+    def _effective_settings(self, num_sentences, deadline=None):
+        settings = {
+            "k_neighbors": self.k_neighbors if self.k_neighbors is not None else default_k_neighbors(num_sentences),
+            "max_iterations": self.max_iterations,
+            "similarity_window": self.similarity_window,
+        }
+        if deadline is None:
+            return settings
+
+        remaining_fraction = deadline.remaining_fraction()
+
+        if remaining_fraction < DEGRADE_K_NEIGHBORS_BELOW and settings["k_neighbors"] > DEGRADED_K_NEIGHBORS:
+            settings["k_neighbors"] = DEGRADED_K_NEIGHBORS
+            deadline.degrade(f"k_neighbors={DEGRADED_K_NEIGHBORS}")
+
+        if remaining_fraction < DEGRADE_PAGERANK_BELOW and settings["max_iterations"] > DEGRADED_PAGERANK_ITERATIONS:
+            settings["max_iterations"] = DEGRADED_PAGERANK_ITERATIONS
+            deadline.degrade(f"pagerank_max_iterations={DEGRADED_PAGERANK_ITERATIONS}")
+
+        exact_similarity_estimate = num_sentences * num_sentences * EXACT_SIMILARITY_SECONDS_PER_PAIR
+        if (remaining_fraction < DEGRADE_SIMILARITY_BELOW or exact_similarity_estimate > deadline.remaining() * 0.5) and \
+           (settings["similarity_window"] is None or settings["similarity_window"] > APPROXIMATE_SIMILARITY_WINDOW):
+            settings["similarity_window"] = APPROXIMATE_SIMILARITY_WINDOW
+            deadline.degrade(f"approximate_similarity(window={APPROXIMATE_SIMILARITY_WINDOW})")
+
+        return settings
+
+    # Last resort when the deadline has passed: rank sentences by position (lead summary)
+    def _rank_by_position(self, sentences, deadline):
+        deadline.degrade("position_fallback")
+        return RankingResult(sentences, list(range(len(sentences))))
+
+    # Runs the full ranking pipeline once; any number of summary lengths can then be sliced from the result.
+    def rank(self, text, deadline=None):
+        sentences = self.segment_sentences(text)
+        if deadline is None:
+            return self._rank(sentences)
+
+        try:
+            return self._rank(sentences, deadline)
+        except DeadlineExceeded:
+            deadline.check_cancelled()
+            return self._rank_by_position(sentences, deadline)
+
+    def _rank(self, sentences, deadline=None):
+        if deadline is not None:
+            deadline.check()
+        if self.execution == "hierarchical":
+            return self._rank_hierarchical(sentences, deadline)
+
+        vectorizer = self.vectorizer_class(norm='l2')
+        if self.execution == "dense":
+            tfidf_vectors, tfidf_rows = vectorizer.fit_transform(sentences), None
+        else:
+            tfidf_vectors, tfidf_rows = None, vectorizer.fit_transform_sparse(sentences)
+        if deadline is not None:
+            deadline.check()
+        settings = self._effective_settings(len(sentences), deadline)
+        settings["execution"] = self.execution
+
+        if self.execution == "dense":
+            graph = self._build_graph(tfidf_vectors, settings["k_neighbors"], settings["similarity_window"], deadline)
+        else:
+            if self.execution == "approximate" and settings["similarity_window"] is None:
+                settings["similarity_window"] = APPROXIMATE_SIMILARITY_WINDOW
+            graph = self._build_sparse_graph(tfidf_rows, settings["k_neighbors"], settings["similarity_window"], deadline)
+        if deadline is not None:
+            deadline.check_cancelled()
+        sentence_scores = self._pagerank(graph, settings["max_iterations"], deadline)
 
         # Sort sentences by their PageRank score in descending order
         ranked_sentences = sorted(
-            ((score, int(name.split()[-1]) - 1) for name, score in self.sentence_scores.items()),
+            ((score, int(name.split()[-1]) - 1) for name, score in sentence_scores.items()),
             key=lambda x: x[0],
             reverse=True
         )
+        ranked_indices = [idx for score, idx in ranked_sentences]
+        return RankingResult(sentences, ranked_indices, sentence_scores, tfidf_vectors, vectorizer, graph, settings,
+                             tfidf_rows)
+
+    # Ranks chunks of HIERARCHICAL_CHUNK_SENTENCES sentences separately (sparse), then ranks the best sentences of
+    # every chunk against each other. Memory and graph size are bounded by the chunk size, not the document.
+    def _rank_hierarchical(self, sentences, deadline=None):
+        stage = TextRankSummarizer(self.k_neighbors, self.damping_factor, self.max_iterations, self.tolerance,
+                                   similarity_window=self.similarity_window, vectorizer_class=self.vectorizer_class,
+                                   execution="sparse")
+        chunk_starts = range(0, len(sentences), HIERARCHICAL_CHUNK_SENTENCES)
+        keep_per_chunk = max(1, HIERARCHICAL_MAX_CANDIDATES // max(1, len(chunk_starts)))
+
+        candidates = []
+        runners_up = []  # per chunk, the sentences that did not make it into the second stage, best first
+        for start in chunk_starts:
+            chunk_ranking = stage._rank(sentences[start:start + HIERARCHICAL_CHUNK_SENTENCES], deadline)
+            chunk_ranked = [start + idx for idx in chunk_ranking.ranked_indices]
+            candidates.extend(chunk_ranked[:keep_per_chunk])
+            runners_up.append(chunk_ranked[keep_per_chunk:])
+
+        candidates.sort()
+        final_ranking = stage._rank([sentences[idx] for idx in candidates], deadline)
+        ranked_indices = [candidates[idx] for idx in final_ranking.ranked_indices]
+        # Longer summaries continue round-robin through the chunks so every part of the document is represented
+        for position in range(max((len(chunk) for chunk in runners_up), default=0)):
+            ranked_indices.extend(chunk[position] for chunk in runners_up if position < len(chunk))
+
+        settings = {**final_ranking.settings, "execution": "hierarchical", "chunks": len(chunk_starts),
+                    "candidates": len(candidates)}
+        return RankingResult(sentences, ranked_indices, tfidf_rows=final_ranking.tfidf_rows,
+                             vectorizer=final_ranking.vectorizer, graph=final_ranking.graph, settings=settings)
+
+    def summarize(self, text, num_sentences=None, ratio=None, selectedOptionValue=None, deadline=None):
+        ranking = self.rank(text, deadline)
         
         # if num_sentences is not None:
         #     final_num_sentences = min(num_sentences, len(self.sentences))
@@ -381,169 +929,110 @@ class TextRankSummarizer:
         #     final_num_sentences = min(3, len(self.sentences)) # Default to 3 sentences
         # final_num_sentences = max(1, int(len(self.sentences) * ratio))
         
-        original_sentence_count = len(self.sentences)
-    
-        if original_sentence_count <= 0:
-            return "Sentence count is zero"
-
-        summary_option = selectedOptionValue.lower().strip() # Normalize input
-
-        num_of_sentences = 0 # Initialize the variable
-
-        # --- Document Length Tiers ---
-        if 1 <= original_sentence_count <= 20:
-            # Tier 1: Very Short Documents
-            if summary_option == "very_short":
-                num_of_sentences = min(2, original_sentence_count) # Max 2, but not more than original
-                num_of_sentences = max(1, num_of_sentences) # Ensure at least 1
-            elif summary_option == "short":
-                num_of_sentences = min(4, original_sentence_count)
-                num_of_sentences = max(3, num_of_sentences)
-            elif summary_option == "medium":
-                num_of_sentences = min(7, original_sentence_count)
-                num_of_sentences = max(5, num_of_sentences)
-            elif summary_option == "long":
-                num_of_sentences = min(10, original_sentence_count) # Cap at 10, or up to 50%
-                # For "long" in very short documents, a higher percentage might be implied.
-                # Let's say up to 50% but not more than 10.
-                percentage_based = int(original_sentence_count * 0.5)
-                num_of_sentences = min(max(10, percentage_based), original_sentence_count)
-                num_of_sentences = max(8, num_of_sentences) # Ensure at least 8
-
-        elif 21 <= original_sentence_count <= 100:
-            # Tier 2: Short to Medium Documents
-            if summary_option == "very_short":
-                num_of_sentences = min(3, original_sentence_count) # Fixed min for very short
-            elif summary_option == "short":
-                num_of_sentences = max(5, int(original_sentence_count * 0.08)) # Min 5, or 8%
-            elif summary_option == "medium":
-                num_of_sentences = max(8, int(original_sentence_count * 0.15)) # Min 8, or 15%
-            elif summary_option == "long":
-                num_of_sentences = max(15, int(original_sentence_count * 0.25)) # Min 15, or 25%
-
-        elif 101 <= original_sentence_count <= 500:
-            # Tier 3: Medium to Long Documents
-            if summary_option == "very_short":
-                num_of_sentences = min(5, original_sentence_count) # Fixed min for very short
-            elif summary_option == "short":
-                num_of_sentences = int(original_sentence_count * 0.08) # 8%
-            elif summary_option == "medium":
-                num_of_sentences = int(original_sentence_count * 0.15) # 15%
-            elif summary_option == "long":
-                num_of_sentences = int(original_sentence_count * 0.25) # 25%
-
-        elif original_sentence_count > 500:
-            # Tier 4: Very Long Documents
-            if summary_option == "very_short":
-                num_of_sentences = min(7, original_sentence_count) # Fixed min for very short
-            elif summary_option == "short":
-                num_of_sentences = int(original_sentence_count * 0.05) # 5%
-            elif summary_option == "medium":
-                num_of_sentences = int(original_sentence_count * 0.10) # 10%
-            elif summary_option == "long":
-                # 18% with an optional hard cap, e.g., max 150 sentences
-                num_of_sentences = min(int(original_sentence_count * 0.18), 150) # Cap at 150 for "long"
-                
-        # Ensure minimum of 1 sentence for any valid input, unless original is 0.
-        if num_of_sentences == 0 and original_sentence_count > 0:
-            # Fallback for unexpected summary_option or edge cases
-            num_of_sentences = 1
-
-        # Ensure it doesn't exceed the original sentence count
-        num_of_sentences = min(num_of_sentences, original_sentence_count)
-        # Ensure at least 1 sentence if original had sentences
-        if original_sentence_count > 0 and num_of_sentences == 0:
-            num_of_sentences = 1
-
-        final_num_sentences= num_of_sentences
-        # Extract the top-ranked sentences in their original order
-        extracted_sentence_indices = sorted([idx for score, idx in ranked_sentences[:final_num_sentences]])
-        
-        summary_sentences = [self.sentences[idx] for idx in extracted_sentence_indices]
-        return " ".join(summary_sentences)
-
-
-# Global dictionary to track noun priority for sorting (1 = proper noun, 2 = common noun)
-noun_priority_map = {}
-
-def is_clean_noun(word):
+        return ranking.summary_for_option(selectedOptionValue)
+
+
+# Emojis and symbols that disqualify a keyword candidate
+KEYWORD_SYMBOL_PATTERN = re.compile(
+    "[" 
+    u"\U0001F600-\U0001F64F"
+    u"\U0001F300-\U0001F5FF"
+    u"\U0001F680-\U0001F6FF"
+    u"\U0001F1E0-\U0001F1FF"
+    u"\U00002500-\U00002BEF"
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    u"\U0001f926-\U0001f937"
+    u"\U00010000-\U0010ffff"
+    u"\u200d"
+    u"\u2640-\u2642"
+    u"\u2600-\u2B55"
+    u"\u23cf"
+    u"\u23e9"
+    u"\u231a"
+    u"\u3030"
+    u"\ufe0f"
+    "]+", flags=re.UNICODE)
+
+
+# Noun priority for sorting keywords: 1 = proper noun, 2 = common noun, None = not a noun.
+# Returned rather than recorded in a module-level dict so concurrent requests do not write shared state.
+def noun_priority(word):
     # Skip quotes and symbols
     if re.search(r'[\"\'“”‘’`´&—–-]', word):
-        return False
+        return None
 
     # Remove emojis and symbols using unicode ranges
-    emoji_symbol_pattern = re.compile(
-        "[" 
-        u"\U0001F600-\U0001F64F"
-        u"\U0001F300-\U0001F5FF"
-        u"\U0001F680-\U0001F6FF"
-        u"\U0001F1E0-\U0001F1FF"
-        u"\U00002500-\U00002BEF"
-        u"\U00002702-\U000027B0"
-        u"\U000024C2-\U0001F251"
-        u"\U0001f926-\U0001f937"
-        u"\U00010000-\U0010ffff"
-        u"\u200d"
-        u"\u2640-\u2642"
-        u"\u2600-\u2B55"
-        u"\u23cf"
-        u"\u23e9"
-        u"\u231a"
-        u"\u3030"
-        u"\ufe0f"
-        "]+", flags=re.UNICODE)
-    
-    if emoji_symbol_pattern.search(word):
-        return False
+    if KEYWORD_SYMBOL_PATTERN.search(word):
+        return None
 
     # Only allow alphanumeric
     if not word.isalnum():
-        return False
+        return None
 
     try:
         tag = nltk.pos_tag([word])[0][1]
     except Exception:
-        return False
+        return None
 
     # Prioritize proper nouns
     if tag in ('NNP', 'NNPS'):
-        noun_priority_map[word] = 1  # Proper noun
-        return True
+        return 1  # Proper noun
     elif tag in ('NN', 'NNS'):
-        noun_priority_map[word] = 2  # Common noun
-        return True
-    else:
-        return False
+        return 2  # Common noun
+    return None
+
+def is_clean_noun(word):
+    return noun_priority(word) is not None
 
 
 
-def get_top_n_tfidf_words(summarizer, n=10):
+def get_top_n_tfidf_words(ranking, n=10, deadline=None):
     all_word_scores = defaultdict(float)
+
+    # Vectors are missing when the deadline forced a position-based summary before vectorization
+    if ranking.tfidf_vectors is None and ranking.tfidf_rows is None:
+        return {}
+    if deadline is not None and deadline.expired():
+        deadline.degrade("keywords_skipped")
+        return {}
     
-    vectorizer = summarizer.tfidf_vectorizer
-    idx_to_word = {idx: word for word, idx in vectorizer.word_to_idx.items()}
+    idx_to_word = ranking.vectorizer.index_to_word()
 
-    for vector in summarizer.tfidf_vectors:
-        for j, score in enumerate(vector):
-            if score > 1e-9:
-                word = idx_to_word.get(j)
-                if word and is_clean_noun(word):
-                    all_word_scores[word] = max(all_word_scores[word], score)
+    for indices, values in ranking.feature_rows():
+        for j, score in zip(indices, np.abs(values)):  # hashed features carry a sign
+            if score <= 1e-9:
+                continue
+            word = idx_to_word.get(j)
+            if word and is_clean_noun(word):
+                all_word_scores[word] = max(all_word_scores[word], score)
 
     sorted_words = sorted(all_word_scores.items(), key=lambda item: item[1], reverse=True)
-    # sorted_words = sorted(all_word_scores.items(), key=lambda item: (noun_priority_map.get(item[0], 3), -item[1]), reverse=True) # 1 for proper noun, 2 for common, 3 default
+    # sorted_words = sorted(all_word_scores.items(), key=lambda item: (noun_priority(item[0]) or 3, -item[1])) # 1 for proper noun, 2 for common, 3 default
     return dict(sorted_words[:n])
 
    
 
-def Extractive_Summarizer(input_text: str, ratio: float, selectedOptionValue:str) -> str:
+def Extractive_Summarizer(input_text: str, ratio: float, selectedOptionValue:str, segmenter: str = None, deadline=None,
+                          execution: str = "dense") -> str:
     # tfidf_vectorizer = TFIDFVectorizer(norm='l2')
     # tfidf_vectors=tfidf_vectorizer.fit_transform(sentences)
     
-    summarizer = TextRankSummarizer()  
+    summarizer = TextRankSummarizer(segmenter=segmenter, execution=execution)  
     
-    summary = summarizer.summarize(input_text, selectedOptionValue = selectedOptionValue)
-    top_n_nouns = get_top_n_tfidf_words(summarizer,n = 10)
+    ranking = summarizer.rank(input_text, deadline)
+    summary = ranking.summary_for_option(selectedOptionValue)
+    top_n_nouns = get_top_n_tfidf_words(ranking, n = 10, deadline = deadline)
 
     return summary, top_n_nouns
 
+
+# Ranks the text once and returns the summary for every length option.
+def Extractive_Summarizer_All_Lengths(input_text: str, segmenter: str = None, deadline=None, execution: str = "dense"):
+    summarizer = TextRankSummarizer(segmenter=segmenter, execution=execution)
+    ranking = summarizer.rank(input_text, deadline)
+
+    summaries = {option: ranking.summary_for_option(option) for option in SUMMARY_LENGTH_OPTIONS}
+    top_n_nouns = get_top_n_tfidf_words(ranking, n = 10, deadline = deadline)
+
+    return summaries, top_n_nouns, ranking
@@ -1,9 +1,29 @@
 import io
 import docx
 from fastapi import HTTPException, status
+import os
 import re
 import fitz  # PyMuPDF
 
+# PDFs with more pages than this (after any page range) are rejected or downsampled before extraction
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "500"))
+# "downsample" keeps MAX_PDF_PAGES evenly spaced pages, "reject" returns 413
+PDF_OVERSIZE_POLICY = os.getenv("PDF_OVERSIZE_POLICY", "downsample")
+# "full" parses every span PyMuPDF can report (images, ligatures, whitespace) and takes the body font size per page;
+# "light" asks for text only and takes the body font size from one histogram built before any page is filtered
+PDF_EXTRACTION_FIDELITY = os.getenv("PDF_EXTRACTION_FIDELITY", "full")
+PDF_FIDELITY_TIERS = ("full", "light")
+# Light tier flags: no image blocks, ligatures split into letters, whitespace normalized to spaces
+LIGHT_TEXT_FLAGS = fitz.TEXT_MEDIABOX_CLIP
+# Pages (evenly spaced over the selection) read up front for the light tier's document font histogram
+FONT_HISTOGRAM_SAMPLE_PAGES = 32
+# With a max_chars/max_sentences budget only the first pages of the selection are sampled, so the early stop
+# still bounds the work (one title page plus a few body pages is enough to find the body size)
+FONT_HISTOGRAM_BUDGET_SAMPLE_PAGES = 2
+
+# Rough sentence count for extraction budgets: terminal punctuation followed by whitespace or end of line
+SENTENCE_END_PATTERN = re.compile(r"[.!?][\"')\]]*(?=\s|$)")
+
 def get_file_extension(filename: str) -> str:
     return filename.split('.')[-1].lower()
 
@@ -22,6 +42,15 @@ def is_subtitle_font(line_font_size: float, body_font_size: float) -> bool:
         return False
     return body_font_size * 1.1 < line_font_size < body_font_size * 1.5
 
+def count_font_sizes(text_blocks: list, font_sizes: dict) -> dict:
+    # Adds the characters set in each font size to font_sizes (size -> character count)
+    for block in text_blocks:
+        if block['type'] == 0:  # text block
+            for line in block['lines']:
+                for span in line['spans']:
+                    font_sizes[span['size']] = font_sizes.get(span['size'], 0) + len(span['text'])
+    return font_sizes
+
 def is_likely_table_block(text: str, spans: list) -> bool:
     if not spans:
         return False
@@ -55,6 +84,27 @@ def is_likely_table_block(text: str, spans: list) -> bool:
 
 
 
+def extract_document(contents: bytes, file_extension: str, **pdf_options) -> tuple:
+    # -> (text, pdf_extraction); pdf_extraction holds the extract_pdf_content details for PDFs and is None otherwise.
+    # pdf_options are passed to extract_pdf_content (page range, budgets, fidelity, progress_callback).
+    if file_extension == 'txt':
+        try:
+            return contents.decode('utf-8'), None
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Could not decode text file with UTF-8. Please ensure it's a valid text file."
+            )
+    elif file_extension == 'docx':
+        return extract_text_from_docx(io.BytesIO(contents)), None
+    elif file_extension == 'pdf':
+        pdf_content = extract_pdf_content(io.BytesIO(contents), **pdf_options)
+        return pdf_content.pop("text"), pdf_content
+    raise ValueError(f"Unsupported file extension: .{file_extension}")
+
+def extract_text_from_bytes(contents: bytes, file_extension: str, **pdf_options) -> str:
+    return extract_document(contents, file_extension, **pdf_options)[0]
+
 def extract_text_from_docx(file_stream: io.BytesIO) -> str:
     try:
         document = docx.Document(file_stream)
@@ -118,12 +168,92 @@ def extract_text_from_docx(file_stream: io.BytesIO) -> str:
             detail=f"Could not process DOCX file: {e}. Ensure it's a valid .docx format and not password-protected."
         )
 
-def extract_text_from_pdf(file_stream: io.BytesIO) -> str:
+def select_pdf_pages(page_count: int, start_page: int = None, end_page: int = None,
+                     max_pages: int = MAX_PDF_PAGES, oversize_policy: str = PDF_OVERSIZE_POLICY) -> list:
+    # Page numbers are 1-based and inclusive for callers; returned indices are 0-based
+    first_page = start_page or 1
+    last_page = min(end_page or page_count, page_count)
+    if first_page < 1 or first_page > page_count or last_page < first_page:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid page range {start_page}-{end_page}. The PDF has {page_count} pages."
+        )
+
+    page_numbers = list(range(first_page - 1, last_page))
+    if max_pages and len(page_numbers) > max_pages:
+        if oversize_policy == "reject":
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"PDF selection has {len(page_numbers)} pages; the limit is {max_pages}. Choose a smaller page range."
+            )
+        # Keep evenly spaced pages so the summary still covers the whole selection
+        step = len(page_numbers) / max_pages
+        page_numbers = [page_numbers[int(i * step)] for i in range(max_pages)]
+    return page_numbers
+
+def resolve_pdf_fidelity(fidelity: str = None) -> str:
+    fidelity = fidelity or PDF_EXTRACTION_FIDELITY
+    if fidelity not in PDF_FIDELITY_TIERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown PDF fidelity '{fidelity}'. Choose one of: {', '.join(PDF_FIDELITY_TIERS)}."
+        )
+    return fidelity
+
+def extract_text_from_pdf(file_stream: io.BytesIO, **options) -> str:
+    return extract_pdf_content(file_stream, **options)["text"]
+
+def extract_pdf_content(file_stream: io.BytesIO, start_page: int = None, end_page: int = None,
+                        max_chars: int = None, max_sentences: int = None,
+                        max_pages: int = MAX_PDF_PAGES, oversize_policy: str = PDF_OVERSIZE_POLICY,
+                        progress_callback=None, fidelity: str = None) -> dict:
+    # start_page/end_page: 1-based inclusive page range (default: whole document)
+    # max_chars/max_sentences: stop after the page on which this much body text has been collected
+    # max_pages/oversize_policy: cheap page-count check applied before any per-page parsing
+    # progress_callback(pages_read, pages_selected): called after every page parsed, including the light tier's
+    # histogram sample
+    # fidelity: "full" or "light" (see PDF_EXTRACTION_FIDELITY)
+    fidelity = resolve_pdf_fidelity(fidelity)
     main_content_lines = []
 
     try:
         # Open the PDF document from the byte stream
         doc = fitz.open(stream=file_stream.read(), filetype="pdf")
+        if doc.needs_pass:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="PDF is password-protected and cannot be processed."
+            )
+
+        # Page count comes from the document trailer, so this runs before any get_text("dict") call
+        page_count = len(doc)
+        page_numbers = select_pdf_pages(page_count, start_page, end_page, max_pages, oversize_policy)
+        downsampled = len(page_numbers) < (min(end_page or page_count, page_count) - (start_page or 1) + 1)
+        pages_extracted = 0
+        pages_read = 0
+        collected_chars = 0
+        collected_sentences = 0
+        budget_reached = False
+
+        # Light tier: one font histogram over a sample of the selected pages before any page is filtered, so the
+        # body size does not depend on page order or on which pages come first. Without a budget the sample is
+        # spread over the selection; with one it is the first pages, which the early stop reads anyway.
+        # The sampled pages are kept and not extracted again below.
+        prefetched_blocks = {}
+        document_font_sizes = {}
+        if fidelity == "light":
+            if max_chars or max_sentences:
+                sample_pages = page_numbers[:FONT_HISTOGRAM_BUDGET_SAMPLE_PAGES]
+            else:
+                sample_count = min(len(page_numbers), FONT_HISTOGRAM_SAMPLE_PAGES)
+                step = len(page_numbers) / sample_count
+                sample_pages = sorted({page_numbers[int(i * step)] for i in range(sample_count)})
+            for page_num in sample_pages:
+                prefetched_blocks[page_num] = doc.load_page(page_num).get_text("dict", flags=LIGHT_TEXT_FLAGS)["blocks"]
+                count_font_sizes(prefetched_blocks[page_num], document_font_sizes)
+                pages_read += 1
+                if progress_callback is not None:
+                    progress_callback(pages_read, len(page_numbers))
 
         # Define thresholds and heuristics (these will likely need tuning for your specific PDFs)
         # 1. Font Size Heuristics:
@@ -154,7 +284,9 @@ def extract_text_from_pdf(file_stream: io.BytesIO) -> str:
             re.compile(r"^\s*Page\s+\d+\s*$", re.IGNORECASE),
         ]
 
-        for page_num in range(len(doc)):
+        for page_num in page_numbers:
+            if budget_reached:
+                break
             page = doc.load_page(page_num)
             page_height = page.rect.height
 
@@ -162,16 +294,20 @@ def extract_text_from_pdf(file_stream: io.BytesIO) -> str:
             # 'text' is often sufficient, but 'blocks' or 'dict' gives more detail
             # 'blocks' -> (x0, y0, x1, y1, "lines of text", block_no, block_type)
             # 'dict' -> more structured info including fonts, sizes, flags
-            text_blocks = page.get_text("dict")["blocks"]
+            if fidelity == "light":
+                text_blocks = prefetched_blocks.pop(page_num, None)
+                if text_blocks is None:
+                    text_blocks = page.get_text("dict", flags=LIGHT_TEXT_FLAGS)["blocks"]
+                    pages_read += 1
+            else:
+                text_blocks = page.get_text("dict")["blocks"]
+                pages_read += 1
 
             # Dynamically determine common body font size on this page (simple heuristic)
             # This is a bit of a hack, assumes the most frequent font size is body text
-            font_sizes = {}
-            for block in text_blocks:
-                if block['type'] == 0:  # text block
-                    for line in block['lines']:
-                        for span in line['spans']:
-                            font_sizes[span['size']] = font_sizes.get(span['size'], 0) + len(span['text'])
+            # The light tier uses the document histogram instead, so sparse pages (title pages, figure pages)
+            # get the body size of the document rather than their own largest text
+            font_sizes = document_font_sizes if fidelity == "light" else count_font_sizes(text_blocks, {})
             
             # Find the most frequent font size by character count
             most_common_font_size = 0
@@ -246,6 +382,16 @@ def extract_text_from_pdf(file_stream: io.BytesIO) -> str:
                         not is_toc_line(line_text) and \
                         not is_table_block:
                             main_content_lines.append(line_text)
+                            collected_chars += len(line_text)
+                            collected_sentences += len(SENTENCE_END_PATTERN.findall(line_text))
+
+            pages_extracted += 1
+            if progress_callback is not None:
+                progress_callback(pages_read, len(page_numbers))
+            # Early termination once enough body text has been collected
+            if (max_chars and collected_chars >= max_chars) or \
+               (max_sentences and collected_sentences >= max_sentences):
+                budget_reached = True
 
 
         # Post-processing: Additional cleanup after initial extraction
@@ -295,8 +441,17 @@ def extract_text_from_pdf(file_stream: io.BytesIO) -> str:
         # Remove multiple consecutive newlines (reduces empty space)
         final_text = re.sub(r"\n\s*\n", "\n", final_text).strip()
 
-        return final_text
-
+        return {
+            "text": final_text,
+            "page_count": page_count,
+            "pages_extracted": pages_extracted,
+            "downsampled": downsampled,
+            "truncated": budget_reached and pages_extracted < len(page_numbers),
+            "fidelity": fidelity
+        }
+
+    except HTTPException:
+        raise
     except fitz.FileDataError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -0,0 +1,386 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from fastapi import HTTPException
+
+# Background summarization jobs for documents too large for a synchronous request.
+# Job state lives in SQLite so queued and running jobs survive a worker or API crash:
+# running jobs whose heartbeat stops are put back in the queue and retried.
+# Run standalone workers with: python job_queue.py
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))                         # worker processes in the pool (0 disables)
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))  # finished jobs are deleted after this
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))               # crashes tolerated before a job fails
+JOB_PRIORITY_AGING_BYTES_PER_SECOND = 10_000  # queued jobs gain priority over time so large ones are not starved
+JOB_POLL_SECONDS = 0.5
+JOB_HEARTBEAT_SECONDS = 5
+JOB_HEARTBEAT_TIMEOUT_SECONDS = 30
+JOB_SUPERVISOR_SECONDS = 2
+JOB_CLEANUP_SECONDS = 60
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+# Claim order: smallest input first, aged by time in the queue. The "now" term shifts every job equally,
+# so the order of queued jobs only changes when jobs are added or removed.
+QUEUE_ORDER_KEY = "priority + created_at * ?"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT,
+    priority INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    input BLOB,
+    pages_extracted INTEGER,
+    pages_total INTEGER,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at);
+"""
+
+
+class JobStore:
+    # Thin SQLite wrapper; every call opens its own connection so it is safe across threads and processes
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def create_job(self, kind: str, params: dict, input_data: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, kind, status, stage, priority, params, input, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_STATUS_QUEUED, JOB_STATUS_QUEUED, len(input_data), json.dumps(params),
+                 input_data, time.time())
+            )
+        return job_id
+
+    def claim_next_job(self, worker_id: str):
+        # Smallest input first, with aging so that old large jobs eventually win
+        now = time.time()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                f"SELECT * FROM jobs WHERE status = ? ORDER BY {QUEUE_ORDER_KEY}, created_at LIMIT 1",
+                (JOB_STATUS_QUEUED, JOB_PRIORITY_AGING_BYTES_PER_SECOND)
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, worker_id = ?, attempts = attempts + 1, "
+                    "started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (JOB_STATUS_RUNNING, "starting", worker_id, now, now, row["id"])
+                )
+            connection.execute("COMMIT")
+            return dict(row) if row is not None else None
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def update_progress(self, job_id: str, stage: str = None, pages_extracted: int = None, pages_total: int = None):
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET stage = COALESCE(?, stage), pages_extracted = COALESCE(?, pages_extracted), "
+                "pages_total = COALESCE(?, pages_total), heartbeat_at = ? WHERE id = ? AND status = ?",
+                (stage, pages_extracted, pages_total, time.time(), job_id, JOB_STATUS_RUNNING)
+            )
+
+    def heartbeat(self, job_id: str):
+        self.update_progress(job_id)
+
+    # complete_job/fail_job only touch the job while this worker still owns it: a job that was requeued
+    # (stalled heartbeat) and claimed by another worker is not overwritten when the original worker finishes.
+    # Both return whether the result was recorded.
+    def complete_job(self, job_id: str, worker_id: str, result: dict) -> bool:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, stage = ?, result = ?, input = NULL, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = ?",
+                (JOB_STATUS_COMPLETED, JOB_STATUS_COMPLETED, json.dumps(result), time.time(), job_id, worker_id,
+                 JOB_STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+
+    def fail_job(self, job_id: str, worker_id: str, error: str) -> bool:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, stage = ?, error = ?, input = NULL, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = ?",
+                (JOB_STATUS_FAILED, JOB_STATUS_FAILED, error, time.time(), job_id, worker_id, JOB_STATUS_RUNNING)
+            )
+            return cursor.rowcount > 0
+
+    def get_job(self, job_id: str):
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT id, kind, status, stage, priority, params, pages_extracted, pages_total, result, error, "
+                "attempts, created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_job_input(self, job_id: str) -> bytes:
+        with self._connect() as connection:
+            row = connection.execute("SELECT input FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["input"] if row is not None else None
+
+    def queue_position(self, job_id: str) -> int:
+        # Queued jobs that claim_next_job would pick before this one
+        aging = JOB_PRIORITY_AGING_BYTES_PER_SECOND
+        with self._connect() as connection:
+            job = connection.execute("SELECT priority, created_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return 0
+            key = job["priority"] + job["created_at"] * aging
+            row = connection.execute(
+                f"SELECT COUNT(*) AS ahead FROM jobs WHERE status = ? AND id != ? AND "
+                f"({QUEUE_ORDER_KEY} < ? OR ({QUEUE_ORDER_KEY} = ? AND created_at < ?))",
+                (JOB_STATUS_QUEUED, job_id, aging, key, aging, key, job["created_at"])
+            ).fetchone()
+        return row["ahead"]
+
+    def recover_stalled_jobs(self, worker_ids=None) -> int:
+        # Requeue running jobs whose worker died (given ids) or whose heartbeat stopped;
+        # jobs that already used up their attempts are failed instead of retried forever
+        stale_before = time.time() - JOB_HEARTBEAT_TIMEOUT_SECONDS
+        worker_ids = list(worker_ids or [])
+        worker_filter = f" OR worker_id IN ({','.join('?' * len(worker_ids))})" if worker_ids else ""
+        condition = f"status = ? AND (heartbeat_at < ?{worker_filter})"
+        arguments = (JOB_STATUS_RUNNING, stale_before, *worker_ids)
+        with self._connect() as connection:
+            connection.execute(
+                f"UPDATE jobs SET status = ?, stage = ?, error = ?, input = NULL, finished_at = ? "
+                f"WHERE {condition} AND attempts >= ?",
+                (JOB_STATUS_FAILED, JOB_STATUS_FAILED, "Worker crashed while processing this job.", time.time(),
+                 *arguments, JOB_MAX_ATTEMPTS)
+            )
+            cursor = connection.execute(
+                f"UPDATE jobs SET status = ?, stage = ?, worker_id = NULL WHERE {condition}",
+                (JOB_STATUS_QUEUED, JOB_STATUS_QUEUED, *arguments)
+            )
+            return cursor.rowcount
+
+    def delete_expired_jobs(self, ttl_seconds: int = JOB_RESULT_TTL_SECONDS) -> int:
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, time.time() - ttl_seconds)
+            )
+            return cursor.rowcount
+
+
+def job_status_payload(job: dict, store: JobStore) -> dict:
+    payload = {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": {
+            "pages_extracted": job["pages_extracted"],
+            "pages_total": job["pages_total"],
+        },
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"],
+    }
+    if job["status"] == JOB_STATUS_QUEUED:
+        payload["queue_position"] = store.queue_position(job["id"])
+    return payload
+
+
+# --- Worker side ---
+
+def run_job(store: JobStore, job: dict):
+    # Imported here so the API process does not pay for them until a pool actually runs
+    from deadline import Deadline
+    from helper_file_functions import extract_document
+    from summary_service import summarize_text, file_summary_response
+
+    job_id = job["id"]
+    params = json.loads(job["params"])
+    input_data = store.get_job_input(job_id)
+    deadline = Deadline.from_milliseconds(params.get("timeoutMs"))
+
+    if job["kind"] == "text":
+        store.update_progress(job_id, stage="summarizing")
+        text = input_data.decode("utf-8")
+        result = summarize_text(text, params["ratio"], params["selectedOptionValue"], params.get("segmenter"), deadline)
+        return {**result, "originalContentText": text}
+
+    store.update_progress(job_id, stage="extracting")
+    raw_text, pdf_extraction = extract_document(
+        input_data,
+        params["file_extension"],
+        start_page=params.get("startPage"),
+        end_page=params.get("endPage"),
+        max_chars=params.get("maxChars"),
+        max_sentences=params.get("maxSentences"),
+        fidelity=params.get("pdfFidelity"),
+        progress_callback=lambda done, total: store.update_progress(
+            job_id, pages_extracted=done, pages_total=total
+        )
+    )
+
+    if not raw_text.strip():
+        raise ValueError("Extracted text is empty or contains only whitespace. Cannot summarize an empty document.")
+
+    store.update_progress(job_id, stage="summarizing")
+    result = summarize_text(raw_text, params["ratio"], params["selectedOptionValue"], params.get("segmenter"), deadline)
+    return file_summary_response(result, raw_text, params["filename"], params["ratio"],
+                                 params["selectedOptionValue"], pdf_extraction)
+
+
+def _heartbeat_loop(store: JobStore, current_job: dict, stop_event):
+    while not stop_event.wait(JOB_HEARTBEAT_SECONDS):
+        job_id = current_job.get("id")
+        if job_id is not None:
+            # A failed beat (e.g. the database is locked) is logged and retried on the next tick; letting the
+            # thread die would stop all heartbeats and get the running job requeued
+            try:
+                store.heartbeat(job_id)
+            except Exception:
+                traceback.print_exc()
+
+
+def worker_main(db_path: str, worker_id: str, stop_event):
+    store = JobStore(db_path)
+    current_job = {}
+    threading.Thread(target=_heartbeat_loop, args=(store, current_job, stop_event), daemon=True).start()
+
+    while not stop_event.is_set():
+        job = store.claim_next_job(worker_id)
+        if job is None:
+            stop_event.wait(JOB_POLL_SECONDS)
+            continue
+
+        current_job["id"] = job["id"]
+        try:
+            store.complete_job(job["id"], worker_id, run_job(store, job))
+        except HTTPException as e:
+            store.fail_job(job["id"], worker_id, str(e.detail))
+        except Exception as e:
+            traceback.print_exc()
+            store.fail_job(job["id"], worker_id, f"An error occurred during summarization: {e}")
+        finally:
+            current_job.pop("id", None)
+
+
+class JobWorkerPool:
+    # Supervises worker processes: restarts dead ones, requeues their jobs and expires old results
+
+    def __init__(self, db_path: str = JOB_DB_PATH, concurrency: int = JOB_WORKERS):
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.store = JobStore(db_path)
+        # "spawn" keeps workers independent of the server's threads and event loop
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._workers = {}
+        self._supervisor = None
+        self._lock_file = None
+
+    # One pool per job database: every uvicorn worker process runs the lifespan, but only the first to take this
+    # lock starts job workers, so JOB_WORKERS is the total and not per API process. The OS drops the lock when
+    # its holder exits; the pool then runs again after the next API restart (or via `python job_queue.py`).
+    def _acquire_pool_lock(self) -> bool:
+        try:
+            import fcntl
+        except ImportError:
+            return True  # no advisory locks on this platform: run with JOB_WORKERS=0 and a standalone pool
+        lock_file = open(f"{self.db_path}.pool.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _start_worker(self, slot: int):
+        worker_id = f"{os.getpid()}-{slot}-{uuid.uuid4().hex[:8]}"
+        process = self._context.Process(
+            target=worker_main, args=(self.db_path, worker_id, self._stop_event),
+            name=f"summary-job-worker-{slot}", daemon=True
+        )
+        process.start()
+        self._workers[slot] = (worker_id, process)
+
+    def _supervise(self):
+        last_cleanup = 0.0
+        while not self._stop_event.wait(JOB_SUPERVISOR_SECONDS):
+            dead_worker_ids = []
+            for slot, (worker_id, process) in list(self._workers.items()):
+                if not process.is_alive():
+                    dead_worker_ids.append(worker_id)
+                    self._start_worker(slot)
+            self.store.recover_stalled_jobs(dead_worker_ids)
+
+            if time.time() - last_cleanup >= JOB_CLEANUP_SECONDS:
+                self.store.delete_expired_jobs()
+                last_cleanup = time.time()
+
+    def start(self):
+        if not self._acquire_pool_lock():
+            return False
+        self.store.recover_stalled_jobs()
+        for slot in range(self.concurrency):
+            self._start_worker(slot)
+        self._supervisor = threading.Thread(target=self._supervise, name="summary-job-supervisor", daemon=True)
+        self._supervisor.start()
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        for worker_id, process in self._workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()  # releases the lock
+            self._lock_file = None
+
+
+if __name__ == "__main__":
+    pool = JobWorkerPool()
+    if not pool.start():
+        raise SystemExit(f"Another job worker pool is already running on {pool.db_path}.")
+    print(f"Running {pool.concurrency} summarization job workers on {pool.db_path}. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
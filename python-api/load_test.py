@@ -0,0 +1,266 @@
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from helper_file_functions import extract_text_from_bytes
+from sample_corpus import SAMPLE_UPLOADS_DIR, load_sample_corpus
+from sentence_segmenters import get_segmenter
+
+# Load generator for the summarization API.
+# Drives /api/extractive-summary and /api/extractive-summary-file with a mix of sample uploads
+# and synthetic texts, then reports throughput, latency percentiles and error rates.
+# Usage:
+#   python load_test.py --spawn --workers 4 --concurrency 8 --duration 60
+#   python load_test.py --url http://localhost:8000 --requests 200 --json report.json
+
+SUMMARY_OPTIONS = ("very_short", "short", "medium", "long")
+MIME_TYPES = {
+    'txt': 'text/plain',
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+# Synthetic document sizes in sentences, one per document length tier
+SYNTHETIC_SENTENCE_COUNTS = (12, 60, 250, 700)
+
+
+def build_workload(uploads_dir: str, synthetic_per_tier: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    files = load_sample_corpus(uploads_dir)
+    segment_sentences = get_segmenter("regex")
+
+    texts = []
+    sentence_pool = []
+    for display_name, file_extension, contents in files:
+        text = extract_text_from_bytes(contents, file_extension)
+        if text.strip():
+            texts.append((display_name, text))
+            sentence_pool.extend(segment_sentences(text))
+
+    # Synthetic texts are random draws from the corpus sentences at each tier size
+    for sentence_count in SYNTHETIC_SENTENCE_COUNTS:
+        for i in range(synthetic_per_tier):
+            sentences = [rng.choice(sentence_pool) for _ in range(sentence_count)]
+            texts.append((f"synthetic-{sentence_count}-{i + 1}", " ".join(sentences)))
+
+    return {"texts": texts, "files": files}
+
+
+def encode_multipart(fields: dict, file_field: str, filename: str, contents: bytes, content_type: str):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode()
+        )
+    parts.append(
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{file_field}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: {content_type}\r\n\r\n".encode()
+    )
+    parts.append(contents)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def make_request(base_url: str, workload: dict, file_ratio: float, rng: random.Random):
+    option = rng.choice(SUMMARY_OPTIONS)
+    if workload["files"] and rng.random() < file_ratio:
+        display_name, file_extension, contents = rng.choice(workload["files"])
+        body, content_type = encode_multipart(
+            {"ratio": "0.3", "selectedOptionValue": option},
+            "file", display_name, contents, MIME_TYPES[file_extension]
+        )
+        return "extractive-summary-file", display_name, urllib.request.Request(
+            f"{base_url}/api/extractive-summary-file", data=body, headers={"Content-Type": content_type}
+        )
+
+    display_name, text = rng.choice(workload["texts"])
+    body = json.dumps({"text": text, "ratio": 0.3, "selectedOptionValue": option}).encode()
+    return "extractive-summary", display_name, urllib.request.Request(
+        f"{base_url}/api/extractive-summary", data=body, headers={"Content-Type": "application/json"}
+    )
+
+
+def send(request: urllib.request.Request, timeout: float):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status_code = response.status
+    except urllib.error.HTTPError as e:
+        status_code = e.code
+    except Exception as e:
+        return time.perf_counter() - start, None, type(e).__name__
+    return time.perf_counter() - start, status_code, None
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_results(results: list, elapsed: float) -> dict:
+    latencies = sorted(result["latency"] for result in results if result["ok"])
+    errors = [result for result in results if not result["ok"]]
+    error_kinds = {}
+    for result in errors:
+        key = str(result["status"] or result["error"])
+        error_kinds[key] = error_kinds.get(key, 0) + 1
+    return {
+        "requests": len(results),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "error_kinds": error_kinds,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": 1000 * percentile(latencies, 0.50),
+            "p95": 1000 * percentile(latencies, 0.95),
+            "p99": 1000 * percentile(latencies, 0.99),
+            "max": 1000 * latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+def run_load(base_url: str, workload: dict, concurrency: int, duration: float, total_requests: int,
+             file_ratio: float, timeout: float, seed: int) -> dict:
+    if not duration and not total_requests:
+        raise ValueError("Set a duration or a total request count; with neither the run would never end.")
+    results = []
+    results_lock = threading.Lock()
+    request_counter = iter(range(total_requests)) if total_requests else None
+    counter_lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def should_continue():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if request_counter is not None:
+            with counter_lock:
+                return next(request_counter, None) is not None
+        return True
+
+    def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        while should_continue():
+            endpoint, document, request = make_request(base_url, workload, file_ratio, rng)
+            latency, status_code, error = send(request, timeout)
+            with results_lock:
+                results.append({
+                    "endpoint": endpoint,
+                    "document": document,
+                    "latency": latency,
+                    "status": status_code,
+                    "error": error,
+                    "ok": status_code == 200,
+                })
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(worker, worker_id) for worker_id in range(concurrency)]
+        # A client that died would silently lighten the load: surface its exception instead
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    by_endpoint = {}
+    for endpoint in sorted({result["endpoint"] for result in results}):
+        by_endpoint[endpoint] = summarize_results([r for r in results if r["endpoint"] == endpoint], elapsed)
+
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed,
+        "overall": summarize_results(results, elapsed),
+        "endpoints": by_endpoint,
+    }
+
+
+def start_server(port: int, workers: int):
+    # Local uvicorn instance running this directory's app
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/", timeout=1):
+                return process, base_url
+        except Exception:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 60 seconds")
+
+
+def format_table(report: dict) -> str:
+    lines = [
+        f"{report['base_url']}  concurrency={report['concurrency']}  workers={report.get('workers', '-')}  "
+        f"elapsed={report['elapsed_seconds']:.1f}s",
+        f"{'endpoint':<24} {'requests':>8} {'errors':>7} {'err %':>6} {'rps':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+    ]
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, row in rows:
+        latency = row["latency_ms"]
+        lines.append(
+            f"{name:<24} {row['requests']:>8} {row['errors']:>7} {100 * row['error_rate']:>6.1f} "
+            f"{row['throughput_rps']:>7.2f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+            f"{latency['p99']:>8.1f} {latency['max']:>8.1f}"
+        )
+    if report["overall"]["error_kinds"]:
+        lines.append(f"Errors: {report['overall']['error_kinds']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the summarization API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running API.")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn instance instead of using --url.")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the spawned uvicorn instance.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes when spawning.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client connections.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of sustained load (0 to use --requests).")
+    parser.add_argument("--requests", type=int, default=0, help="Total requests to send instead of a duration.")
+    parser.add_argument("--file-ratio", type=float, default=0.3, help="Share of requests sent as file uploads.")
+    parser.add_argument("--synthetic-per-tier", type=int, default=3, help="Synthetic texts per document length tier.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--uploads-dir", default=SAMPLE_UPLOADS_DIR, help="Directory of sample documents.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report as JSON to this path.")
+    args = parser.parse_args()
+    if args.duration <= 0 and args.requests <= 0:
+        parser.error("--duration 0 needs --requests N, otherwise the run never ends")
+
+    workload = build_workload(args.uploads_dir, args.synthetic_per_tier, args.seed)
+    server = None
+    base_url = args.url.rstrip("/")
+    if args.spawn:
+        server, base_url = start_server(args.port, args.workers)
+
+    try:
+        report = run_load(base_url, workload, args.concurrency, args.duration if not args.requests else 0,
+                          args.requests, args.file_ratio, args.timeout, args.seed)
+        report["workers"] = args.workers if args.spawn else None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(format_table(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
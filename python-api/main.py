@@ -1,16 +1,51 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, status
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import uvicorn
 
-from nltk.tokenize import sent_tokenize
-from nltk.tokenize import word_tokenize
-import io
+import asyncio
+import functools
+import json
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional
 
-from extractive_functions import Extractive_Summarizer
-from helper_file_functions import get_file_extension, extract_text_from_docx, extract_text_from_pdf
+from extractive_functions import build_summary, get_preprocessing_cache_stats
+from summary_service import (
+    summarize_text, summarize_all_lengths, summary_details, file_summary_response, get_summary_executor,
+    shutdown_summary_executor,
+)
+from sentence_segmenters import get_segmenter
+from ranking_cache import ranking_cache
+from deadline import Deadline, SummarizationCancelled
+from helper_file_functions import get_file_extension, extract_document, resolve_pdf_fidelity
+from parallel_preprocessing import get_preprocessing_pool, shutdown_preprocessing_pool
+from job_queue import JobStore, JobWorkerPool, JOB_WORKERS, JOB_STATUS_COMPLETED, JOB_STATUS_FAILED, job_status_payload
+
+# Background job workers run alongside the API unless JOB_WORKERS=0 (then run `python job_queue.py` separately).
+# With several uvicorn workers only one API process starts the pool (see JobWorkerPool._acquire_pool_lock).
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool = JobWorkerPool() if JOB_WORKERS > 0 else None
+    if pool is not None and not pool.start():
+        pool = None
+    # Warm the intra-document preprocessing workers before the first long document arrives
+    preprocessing_pool = get_preprocessing_pool()
+    if preprocessing_pool is not None:
+        await asyncio.to_thread(preprocessing_pool.start)
+    yield
+    if pool is not None:
+        pool.stop()
+    shutdown_summary_executor()
+    shutdown_preprocessing_pool()
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+# Default time budget for a summarization when the caller does not send timeoutMs (unset = no deadline)
+DEFAULT_SUMMARY_TIMEOUT_MS = int(os.getenv("SUMMARY_TIMEOUT_MS")) if os.getenv("SUMMARY_TIMEOUT_MS") else None
+# How often a running summarization checks whether the client has disconnected
+DISCONNECT_POLL_SECONDS = 0.25
 
 # --- CORS Configuration ---
 origins = [
@@ -31,81 +66,152 @@ class ExtractiveSummarizerRequest(BaseModel):
     text: str
     ratio: float
     selectedOptionValue: str
-    
+    segmenter: Optional[str] = None # "punkt" or "regex"; defaults to SENTENCE_SEGMENTER env var
+    allLengths: bool = False # Also return every summary length and a ranking_id for follow-up requests
+    timeoutMs: Optional[int] = Field(None, gt=0) # Time budget; the pipeline degrades instead of overrunning it
+
+# --- Helpers ---
+ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
+ALLOWED_MIME_TYPES = {
+    'text/plain',
+    'application/pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+# Checks the upload's extension and MIME type and returns the extension
+def validate_upload(file: UploadFile) -> str:
+    file_extension = get_file_extension(file.filename)
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file extension: .{file_extension}. Only .txt, .pdf, and .docx are allowed."
+        )
+
+    if file.content_type not in ALLOWED_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid MIME type: {file.content_type}. Only text/plain, application/pdf, and DOCX types are allowed."
+        )
+    return file_extension
+
+# Runs a blocking summarization in a worker thread and cancels it if the client disconnects
+async def run_cancellable(http_request: Request, deadline: Deadline, func, *args):
+    # Runs on the shared summary thread pool (SUMMARY_THREADS) so concurrent requests rank in parallel
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(loop.run_in_executor(get_summary_executor(), functools.partial(func, *args)))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                deadline.cancel()
+                break
+        await task
+    except SummarizationCancelled:
+        pass
+    # 499: client closed request; nobody is listening, but the worker thread is now free
+    raise HTTPException(status_code=499, detail="Client disconnected; summarization cancelled.")
+
 # --- API Endpoints ---
 @app.get("/")
 async def root():
     return {"message": "Welcome to the FastAPI Python Backend!"}
 
+# Hit rates of the in-process preprocessing caches (per API worker process)
+@app.get("/api/metrics/preprocessing-cache")
+async def api_preprocessing_cache_metrics():
+    return get_preprocessing_cache_stats()
+
 @app.post("/api/extractive-summary")
-async def api_extractive_summary(request: ExtractiveSummarizerRequest):
+async def api_extractive_summary(request: ExtractiveSummarizerRequest, http_request: Request):
     if not request.text.strip():
         raise HTTPException(status_code=400, detail="Text is required(FastAPi)")
 
     try:
-        summary, top_n_nouns_dict = Extractive_Summarizer(request.text, request.ratio, request.selectedOptionValue)
-        keywords_list = list(top_n_nouns_dict.keys())
-        original_length_sentences = len(sent_tokenize(request.text))
-        summary_length_sentences = len(sent_tokenize(summary))    
-        originalWordCount = len([token for token in word_tokenize(request.text) if token.isalnum()])
-        summaryWordCount = len([token for token in word_tokenize(summary) if token.isalnum()])
+        get_segmenter(request.segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    deadline = Deadline.from_milliseconds(request.timeoutMs or DEFAULT_SUMMARY_TIMEOUT_MS)
+    try:
+        if request.allLengths:
+            result = await run_cancellable(
+                http_request, deadline, summarize_all_lengths,
+                request.text, request.selectedOptionValue, request.segmenter, deadline
+            )
+        else:
+            result = await run_cancellable(
+                http_request, deadline, summarize_text,
+                request.text, request.ratio, request.selectedOptionValue, request.segmenter, deadline
+            )
         return {
-            "summary": summary,
-            "originalContentText": request.text,
-            "original_length_sentences": original_length_sentences, 
-            "summary_sentences_count": summary_length_sentences,
-            "keywords": keywords_list,
-            "originalWordCount": originalWordCount,
-            "summaryWordCount": summaryWordCount
+            **result,
+            "originalContentText": request.text
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in summarizing: {str(e)}")
 
+# Returns another summary length from a cached ranking without re-running the summarizer.
+# Rankings are cached per API process, so this only works on the worker that produced the ranking_id.
+@app.get("/api/extractive-summary/rankings/{ranking_id}")
+async def api_extractive_summary_from_ranking(ranking_id: str, selectedOptionValue: str):
+    ranking = ranking_cache.get(ranking_id)
+    if ranking is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=("Ranking not found or expired. Rankings are kept only in the memory of the API process that "
+                    "created them. Request the summary again with allLengths enabled.")
+        )
+
+    segment_sentences = get_segmenter(ranking["segmenter"])
+    summary = build_summary(ranking["sentences"], ranking["ranked_indices"], selectedOptionValue)
+    return {
+        **summary_details(summary, segment_sentences),
+        "ranking_id": ranking_id,
+        "selectedOptionValue": selectedOptionValue,
+        "original_length_sentences": ranking["original_length_sentences"],
+        "keywords": ranking["keywords"],
+        "originalWordCount": ranking["originalWordCount"]
+    }
+
 @app.post("/api/extractive-summary-file")
 async def api_extractive_summary_file(
+    http_request: Request,
     file: UploadFile = File(..., description="The document file (.txt, .pdf, .docx) to summarize."),
     ratio: float = Form(..., ge=0.01, le=1.0, description="The summarization ratio (0.01 to 1.0)."),
-    selectedOptionValue: str = Form(...,description="selectedOptionValue")
+    selectedOptionValue: str = Form(...,description="selectedOptionValue"),
+    segmenter: Optional[str] = Form(None, description="Sentence segmenter backend (punkt, regex). Defaults to the deployment setting."),
+    allLengths: bool = Form(False, description="Also return every summary length and a ranking_id for follow-up requests."),
+    startPage: Optional[int] = Form(None, ge=1, description="PDF only: first page to extract (1-based)."),
+    endPage: Optional[int] = Form(None, ge=1, description="PDF only: last page to extract (inclusive)."),
+    maxChars: Optional[int] = Form(None, ge=1, description="PDF only: stop extracting once this many body characters are collected."),
+    maxSentences: Optional[int] = Form(None, ge=1, description="PDF only: stop extracting once roughly this many sentences are collected."),
+    pdfFidelity: Optional[str] = Form(None, description="PDF only: extraction tier (full, light). Defaults to the deployment setting."),
+    timeoutMs: Optional[int] = Form(None, gt=0, description="Time budget for summarization; the pipeline degrades instead of overrunning it.")
 ):
-    ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
-    ALLOWED_MIME_TYPES = {
-    'text/plain',
-    'application/pdf',
-    'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-}
     # 1. Server-side File Type Validation
-    file_extension = get_file_extension(file.filename)
-    if file_extension not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file extension: .{file_extension}. Only .txt, .pdf, and .docx are allowed."
-        )
+    file_extension = validate_upload(file)
 
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid MIME type: {file.content_type}. Only text/plain, application/pdf, and DOCX types are allowed."
-        )
+    try:
+        get_segmenter(segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     # 2. Read File Content and Extract Text
-    raw_text = ""
     try:
         contents = await file.read() # Read file contents as bytes
-        file_stream = io.BytesIO(contents) # Create a BytesIO stream for parsing libraries
-
-        if file_extension == 'txt':
-            try:
-                raw_text = contents.decode('utf-8') # Decode bytes to string for text files
-            except UnicodeDecodeError:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Could not decode text file with UTF-8. Please ensure it's a valid text file."
-                )
-        elif file_extension == 'docx':
-            raw_text = extract_text_from_docx(file_stream)
-        elif file_extension == 'pdf':
-            raw_text = extract_text_from_pdf(file_stream)
-
+        raw_text, pdf_extraction = extract_document(
+            contents,
+            file_extension,
+            start_page=startPage,
+            end_page=endPage,
+            max_chars=maxChars,
+            max_sentences=maxSentences,
+            fidelity=pdfFidelity
+        )
     except HTTPException: # Re-raise HTTPExceptions from helper functions
         raise
     except Exception as e:
@@ -123,28 +229,21 @@ async def api_extractive_summary_file(
             detail="Extracted text is empty or contains only whitespace. Cannot summarize an empty document."
         )
 
+    deadline = Deadline.from_milliseconds(timeoutMs or DEFAULT_SUMMARY_TIMEOUT_MS)
     try:
-        summary, top_n_nouns_dict = Extractive_Summarizer(raw_text, ratio, selectedOptionValue)
-        
-        keywords_list = list(top_n_nouns_dict.keys())
-        original_length_sentences = len(sent_tokenize(raw_text))
-        summary_length_sentences = len(sent_tokenize(summary))
-        originalWordCount = len([token for token in word_tokenize(raw_text) if token.isalnum()])
-        summaryWordCount = len([token for token in word_tokenize(summary) if token.isalnum()])
-
-        return {
-            "summary": summary,
-            "originalContentText": raw_text,
-            "original_filename": file.filename, 
-            "processed_ratio": ratio,
-            "selectedOptionValue": selectedOptionValue,
-            "original_length_sentences": original_length_sentences,
-            "summary_sentences_count": summary_length_sentences,
-            "keywords": keywords_list,
-            "originalWordCount": originalWordCount,
-            "summaryWordCount": summaryWordCount,
-            "message": "File processed and summarized successfully."
-        }
+        if allLengths:
+            result = await run_cancellable(
+                http_request, deadline, summarize_all_lengths,
+                raw_text, selectedOptionValue, segmenter, deadline
+            )
+        else:
+            result = await run_cancellable(
+                http_request, deadline, summarize_text,
+                raw_text, ratio, selectedOptionValue, segmenter, deadline
+            )
+        return file_summary_response(result, raw_text, file.filename, ratio, selectedOptionValue, pdf_extraction)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error during summarization: {e}") 
         raise HTTPException(
@@ -152,6 +251,101 @@ async def api_extractive_summary_file(
             detail=f"An error occurred during summarization: {str(e)}"
         )
 
+# --- Background Jobs ---
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    return JobStore()
+
+def job_accepted_response(job_id: str) -> dict:
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/jobs/{job_id}",
+        "result_url": f"/api/jobs/{job_id}/result"
+    }
+
+@app.post("/api/jobs/extractive-summary", status_code=status.HTTP_202_ACCEPTED)
+async def api_create_summary_job(request: ExtractiveSummarizerRequest):
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required(FastAPi)")
+    try:
+        get_segmenter(request.segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    params = {
+        "ratio": request.ratio,
+        "selectedOptionValue": request.selectedOptionValue,
+        "segmenter": request.segmenter,
+        "timeoutMs": request.timeoutMs
+    }
+    job_id = await asyncio.to_thread(get_job_store().create_job, "text", params, request.text.encode("utf-8"))
+    return job_accepted_response(job_id)
+
+@app.post("/api/jobs/extractive-summary-file", status_code=status.HTTP_202_ACCEPTED)
+async def api_create_summary_file_job(
+    file: UploadFile = File(..., description="The document file (.txt, .pdf, .docx) to summarize."),
+    ratio: float = Form(..., ge=0.01, le=1.0, description="The summarization ratio (0.01 to 1.0)."),
+    selectedOptionValue: str = Form(...,description="selectedOptionValue"),
+    segmenter: Optional[str] = Form(None, description="Sentence segmenter backend (punkt, regex). Defaults to the deployment setting."),
+    startPage: Optional[int] = Form(None, ge=1, description="PDF only: first page to extract (1-based)."),
+    endPage: Optional[int] = Form(None, ge=1, description="PDF only: last page to extract (inclusive)."),
+    maxChars: Optional[int] = Form(None, ge=1, description="PDF only: stop extracting once this many body characters are collected."),
+    maxSentences: Optional[int] = Form(None, ge=1, description="PDF only: stop extracting once roughly this many sentences are collected."),
+    pdfFidelity: Optional[str] = Form(None, description="PDF only: extraction tier (full, light). Defaults to the deployment setting."),
+    timeoutMs: Optional[int] = Form(None, gt=0, description="Time budget for summarization; the pipeline degrades instead of overrunning it.")
+):
+    file_extension = validate_upload(file)
+    try:
+        get_segmenter(segmenter)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        contents = await file.read()
+    finally:
+        await file.close()
+    if not contents:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Uploaded file is empty.")
+
+    params = {
+        "filename": file.filename,
+        "file_extension": file_extension,
+        "ratio": ratio,
+        "selectedOptionValue": selectedOptionValue,
+        "segmenter": segmenter,
+        "startPage": startPage,
+        "endPage": endPage,
+        "maxChars": maxChars,
+        "maxSentences": maxSentences,
+        "pdfFidelity": resolve_pdf_fidelity(pdfFidelity) if file_extension == 'pdf' else None,
+        "timeoutMs": timeoutMs
+    }
+    job_id = await asyncio.to_thread(get_job_store().create_job, "file", params, contents)
+    return job_accepted_response(job_id)
+
+@app.get("/api/jobs/{job_id}")
+async def api_get_job(job_id: str):
+    store = get_job_store()
+    job = await asyncio.to_thread(store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found or expired.")
+    return await asyncio.to_thread(job_status_payload, job, store)
+
+@app.get("/api/jobs/{job_id}/result")
+async def api_get_job_result(job_id: str):
+    job = await asyncio.to_thread(get_job_store().get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found or expired.")
+    if job["status"] == JOB_STATUS_FAILED:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=job["error"])
+    if job["status"] != JOB_STATUS_COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job['status']} (stage: {job['stage']}). Poll /api/jobs/{job_id} until it completes."
+        )
+    return json.loads(job["result"])
+
 # You can optionally run the app directly from this file for testing
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    # Bounded, thread-safe least-recently-used cache with hit/miss counters.
+    # max_entries=0 disables caching (every lookup is a miss and nothing is stored).
+    # With max_weight and weigh(value) set, the total weight of the entries is bounded as well; a single value
+    # heavier than max_weight is not stored at all.
+
+    def __init__(self, max_entries: int, name: str = "", max_weight: int = None, weigh=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.total_weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        # Caller holds the lock
+        while self._entries and (len(self._entries) > max(self.max_entries, 0) or
+                                 (self.max_weight is not None and self.total_weight > self.max_weight)):
+            key, _ = self._entries.popitem(last=False)
+            self.total_weight -= self._weights.pop(key, 0)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> bool:
+        # -> whether the value was stored
+        if self.max_entries <= 0:
+            return False
+        weight = self.weigh(value) if self.weigh is not None else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return False
+        with self._lock:
+            self.total_weight += weight - self._weights.get(key, 0)
+            self._weights[key] = weight
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+        return True
+
+    def resize(self, max_entries: int):
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._weights.clear()
+            self.total_weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+# Parallel tokenize/tag/lemmatize for long documents.
+# The sentences a document still needs processing for are split into contiguous chunks and sent to a pool of warm
+# worker processes (NLTK data already loaded). Each worker returns its chunk as compact token-id arrays plus the
+# chunk's word list, instead of a pickled list of string lists, and the chunks are decoded back in order.
+
+# Worker processes for intra-document preprocessing; 0 keeps preprocessing serial
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", str(min(4, max(0, (os.cpu_count() or 1) - 1)))))
+# Documents with fewer sentences to process than this stay serial (process hand-off costs more than it saves)
+PARALLEL_PREPROCESS_MIN_SENTENCES = int(os.getenv("PARALLEL_PREPROCESS_MIN_SENTENCES", "200"))
+# Smallest chunk handed to one worker
+MIN_CHUNK_SENTENCES = 25
+
+
+def encode_token_lists(token_lists):
+    # -> (words, token ids, offsets); document i is ids[offsets[i]:offsets[i + 1]]
+    word_ids = {}
+    ids = array('I')
+    offsets = array('I', [0])
+    for tokens in token_lists:
+        ids.extend(word_ids.setdefault(token, len(word_ids)) for token in tokens)
+        offsets.append(len(ids))
+    return list(word_ids), ids.tobytes(), offsets.tobytes()
+
+
+def decode_token_lists(words, ids_bytes, offsets_bytes):
+    ids = array('I')
+    ids.frombytes(ids_bytes)
+    offsets = array('I')
+    offsets.frombytes(offsets_bytes)
+    return [[words[token_id] for token_id in ids[offsets[i]:offsets[i + 1]]] for i in range(len(offsets) - 1)]
+
+
+def _warm_worker():
+    # Load NLTK resources and the tagger once per worker, not on the first chunk
+    from extractive_functions import TFIDFVectorizer
+    TFIDFVectorizer().process_normalized(["warm up the worker"])
+
+
+def _ping(_):
+    return os.getpid()
+
+
+def _process_chunk(normalized_sentences):
+    from extractive_functions import TFIDFVectorizer
+    return encode_token_lists(TFIDFVectorizer().process_normalized(normalized_sentences))
+
+
+class PreprocessingPool:
+    # Process pool of warm preprocessing workers, shared by every request (and thread) in the process
+
+    def __init__(self, workers: int = PREPROCESS_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_warm_worker
+                )
+                # Start every worker now so no request pays for process start-up and NLTK loading
+                list(self._executor.map(_ping, range(self.workers)))
+            return self._executor
+
+    def start(self):
+        self._get_executor()
+        return self
+
+    def _replace_broken(self, executor):
+        # Drop the broken executor (unless another thread already did) and warm a new one in the background
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        threading.Thread(target=self.start, name="preprocessing-pool-restart", daemon=True).start()
+
+    def process(self, normalized_sentences):
+        executor = self._get_executor()
+        chunk_size = max(MIN_CHUNK_SENTENCES, -(-len(normalized_sentences) // self.workers))
+        chunks = [normalized_sentences[i:i + chunk_size] for i in range(0, len(normalized_sentences), chunk_size)]
+        try:
+            token_lists = []
+            for encoded_chunk in executor.map(_process_chunk, chunks):
+                token_lists.extend(decode_token_lists(*encoded_chunk))
+            return token_lists
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault): the executor stays broken, so replace it and finish this
+            # call in-process instead of failing every long document until the API restarts
+            self._replace_broken(executor)
+            from extractive_functions import TFIDFVectorizer
+            return TFIDFVectorizer().process_normalized(normalized_sentences)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_serial_depth = 0  # > 0 while a serial_preprocessing() block is active
+
+
+# The shared pool, or None when parallel preprocessing is off. Daemonic processes (the job workers) cannot
+# start children, so they always preprocess serially; they already run one document per process.
+def get_preprocessing_pool():
+    global _pool
+    if PREPROCESS_WORKERS <= 0 or _serial_depth > 0 or multiprocessing.current_process().daemon:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = PreprocessingPool(PREPROCESS_WORKERS)
+        return _pool
+
+
+# Keeps preprocessing in this process for the duration of the block, so measurement tools time (and trace the
+# memory of) the in-process pipeline instead of worker start-up and worker processes they cannot see
+@contextmanager
+def serial_preprocessing():
+    global _serial_depth
+    with _pool_lock:
+        _serial_depth += 1
+    try:
+        yield
+    finally:
+        with _pool_lock:
+            _serial_depth -= 1
+
+
+def shutdown_preprocessing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
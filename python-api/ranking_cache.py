@@ -0,0 +1,42 @@
+import os
+import uuid
+
+from memo_cache import LRUCache
+
+# Rankings live in the memory of the API process that created them: with several uvicorn workers, a follow-up
+# request routed to another worker does not find the ranking and gets a 404 (re-request with allLengths).
+
+# Number of rankings kept in memory; the least recently used one is evicted first
+DEFAULT_RANKING_CACHE_SIZE = int(os.getenv("RANKING_CACHE_SIZE", "128"))
+# Total sentence characters kept across all rankings; a ranking larger than this on its own is not cached
+DEFAULT_RANKING_CACHE_MAX_CHARS = int(os.getenv("RANKING_CACHE_MAX_CHARS", "20000000"))
+
+
+def ranking_chars(entry: dict) -> int:
+    return sum(len(sentence) for sentence in entry["sentences"])
+
+
+class RankingCache:
+    # Bounded, thread-safe LRU store of document rankings, keyed by an opaque ranking id.
+    # An entry holds only what is needed to slice a summary: sentences, ranked indices and keywords.
+
+    def __init__(self, max_entries: int = DEFAULT_RANKING_CACHE_SIZE, max_chars: int = DEFAULT_RANKING_CACHE_MAX_CHARS):
+        self._entries = LRUCache(max_entries, name="ranking", max_weight=max_chars, weigh=ranking_chars)
+
+    @property
+    def max_entries(self) -> int:
+        return self._entries.max_entries
+
+    def put(self, entry: dict):
+        # -> ranking id, or None when the ranking is too large to cache
+        ranking_id = uuid.uuid4().hex
+        return ranking_id if self._entries.put(ranking_id, entry) else None
+
+    def get(self, ranking_id: str):
+        return self._entries.get(ranking_id)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+ranking_cache = RankingCache()
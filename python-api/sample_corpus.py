@@ -0,0 +1,36 @@
+import hashlib
+import os
+
+from helper_file_functions import get_file_extension, extract_text_from_bytes
+
+# Documents uploaded through the Node backend; used as the benchmark corpus
+SAMPLE_UPLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend", "file_uploads")
+SUPPORTED_EXTENSIONS = {'txt', 'pdf', 'docx'}
+
+
+def load_sample_corpus(directory: str = SAMPLE_UPLOADS_DIR) -> list:
+    # Returns [(display_name, extension, raw_bytes)] with duplicate uploads removed by content hash
+    documents = []
+    seen_hashes = set()
+    for filename in sorted(os.listdir(directory)):
+        file_extension = get_file_extension(filename)
+        if file_extension not in SUPPORTED_EXTENSIONS:
+            continue
+        with open(os.path.join(directory, filename), "rb") as f:
+            contents = f.read()
+        content_hash = hashlib.sha256(contents).hexdigest()
+        if content_hash in seen_hashes:
+            continue
+        seen_hashes.add(content_hash)
+        # Uploads are stored as "<summaryId>-<original name>"
+        display_name = filename.split("-", 1)[-1]
+        documents.append((display_name, file_extension, contents))
+    return documents
+
+
+def load_sample_texts(directory: str = SAMPLE_UPLOADS_DIR) -> list:
+    # Returns [(display_name, extracted_text)] for every unique document in the corpus
+    return [
+        (display_name, extract_text_from_bytes(contents, file_extension))
+        for display_name, file_extension, contents in load_sample_corpus(directory)
+    ]
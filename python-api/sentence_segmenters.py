@@ -0,0 +1,93 @@
+import os
+import re
+
+from nltk.tokenize import sent_tokenize
+
+# Abbreviations that end with a period but do not end a sentence.
+# Kept lowercase and without the trailing period.
+COMMON_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "rev", "gen", "col", "lt", "sgt", "capt",
+    "inc", "ltd", "co", "corp", "dept", "univ", "assn", "bros",
+    "vs", "etc", "al", "approx", "appt", "apt", "misc", "ref", "refs",
+    "jan", "feb", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "e.g", "i.e", "cf", "viz", "a.m", "p.m", "u.s", "u.k", "ph.d",
+}
+# Abbreviations that are also ordinary words ("no", "sec", "mar"); they only count as abbreviations
+# when a number follows, as in "No. 5", "pp. 10-12" or "Mar. 3".
+NUMBERING_ABBREVIATIONS = {"no", "nos", "vol", "vols", "pp", "fig", "figs", "eq", "eqs", "ch", "sec", "mar"}
+
+
+def punkt_segmenter(text: str) -> list:
+    return sent_tokenize(text)
+
+
+class RegexSegmenter:
+    # Candidate boundary: terminal punctuation, optional closing quotes/brackets, then whitespace.
+    BOUNDARY_PATTERN = re.compile(r"[.!?]+[\"'\)\]’”]*\s+")
+    # Word immediately before a period, e.g. "Dr" in "Dr." or "e.g" in "e.g."
+    PRECEDING_WORD_PATTERN = re.compile(r"([A-Za-z][A-Za-z.]*)\.$")
+
+    def __init__(self, abbreviations=None, numbering_abbreviations=None):
+        self.abbreviations = COMMON_ABBREVIATIONS if abbreviations is None else set(abbreviations)
+        self.numbering_abbreviations = (
+            NUMBERING_ABBREVIATIONS if numbering_abbreviations is None else set(numbering_abbreviations)
+        )
+
+    def _is_abbreviation(self, head: str, next_char: str = "") -> bool:
+        match = self.PRECEDING_WORD_PATTERN.search(head)
+        if not match:
+            return False
+        word = match.group(1).lower()
+        # Single letter initials ("J. Smith") never end a sentence
+        if len(word) == 1:
+            return True
+        if word in self.numbering_abbreviations:
+            return next_char.isdigit()
+        return word in self.abbreviations
+
+    def __call__(self, text: str) -> list:
+        sentences = []
+        start = 0
+        for match in self.BOUNDARY_PATTERN.finditer(text):
+            end = match.end()
+            if end >= len(text):
+                break
+
+            # A new sentence should open with an uppercase letter, digit, quote or bracket.
+            # Lowercase continuations are line wraps from PDF output, not boundaries.
+            next_char = text[end]
+            if not (next_char.isupper() or next_char.isdigit() or next_char in "\"'([‘“"):
+                continue
+
+            punctuation = match.group(0).rstrip()
+            if punctuation.startswith(".") and punctuation.rstrip("\"')]’”") == "." \
+                    and self._is_abbreviation(text[start:match.start() + 1], next_char):
+                continue
+
+            sentence = text[start:match.start() + len(punctuation)].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = end
+
+        tail = text[start:].strip()
+        if tail:
+            sentences.append(tail)
+        return sentences
+
+
+SEGMENTERS = {
+    "punkt": punkt_segmenter,
+    "regex": RegexSegmenter(),
+}
+
+# Deployment-wide default, overridable per request
+DEFAULT_SEGMENTER = os.getenv("SENTENCE_SEGMENTER", "punkt")
+
+
+def get_segmenter(name: str = None):
+    segmenter_name = (name or DEFAULT_SEGMENTER).lower().strip()
+    if segmenter_name not in SEGMENTERS:
+        raise ValueError(
+            f"Unknown sentence segmenter: {segmenter_name}. Available: {', '.join(sorted(SEGMENTERS))}"
+        )
+    return SEGMENTERS[segmenter_name]
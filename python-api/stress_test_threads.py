@@ -0,0 +1,128 @@
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from extractive_functions import (
+    LEMMA_CACHE, SENTENCE_CACHE, SUMMARY_LENGTH_OPTIONS, TextRankSummarizer, get_top_n_tfidf_words,
+)
+from parallel_preprocessing import serial_preprocessing
+from sample_corpus import load_sample_texts
+
+# Thread-safety stress test for the summarization core.
+# Every case (document variant x segmenter) is first summarized serially. Then hundreds of the same cases run
+# concurrently on a thread pool through ONE shared TextRankSummarizer per segmenter, in shuffled order, and every
+# concurrent result (all summary lengths, ranking and keywords) must equal its serial counterpart.
+# The preprocessing caches are disabled and preprocessing stays in this process, so the threads themselves
+# tokenize, POS-tag and lemmatize concurrently instead of hitting cached sentences or handing off to workers.
+# Exits with status 1 on any mismatch or error.
+# Usage: python stress_test_threads.py [--tasks 400] [--threads 16] [--seed 0] [--json]
+
+SEGMENTERS = ("punkt", "regex")
+
+
+def build_cases() -> list:
+    cases = []
+    for name, text in load_sample_texts():
+        # Prefixes of different lengths so concurrent tasks hit different size tiers and k_neighbors defaults
+        for fraction in (0.25, 0.5, 1.0):
+            variant = text[:max(1, int(len(text) * fraction))]
+            for segmenter in SEGMENTERS:
+                cases.append({"name": f"{name}[{fraction:.0%}]", "segmenter": segmenter, "text": variant})
+    return cases
+
+
+def summarize_case(summarizer: TextRankSummarizer, text: str) -> dict:
+    ranking = summarizer.rank(text)
+    return {
+        "ranked_indices": ranking.ranked_indices,
+        "summaries": {option: ranking.summary_for_option(option) for option in SUMMARY_LENGTH_OPTIONS},
+        "keywords": list(get_top_n_tfidf_words(ranking, n=10)),
+    }
+
+
+def run_stress_test(tasks: int = 400, threads: int = 16, seed: int = 0) -> dict:
+    cache_sizes = (SENTENCE_CACHE.max_entries, LEMMA_CACHE.max_entries)
+    SENTENCE_CACHE.resize(0)
+    LEMMA_CACHE.resize(0)
+    try:
+        with serial_preprocessing():
+            return _run_stress_test(tasks, threads, seed)
+    finally:
+        SENTENCE_CACHE.resize(cache_sizes[0])
+        LEMMA_CACHE.resize(cache_sizes[1])
+
+
+def _run_stress_test(tasks: int, threads: int, seed: int) -> dict:
+    cases = build_cases()
+    summarizers = {segmenter: TextRankSummarizer(segmenter=segmenter) for segmenter in SEGMENTERS}
+
+    start = time.perf_counter()
+    expected = [summarize_case(summarizers[case["segmenter"]], case["text"]) for case in cases]
+    serial_seconds = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    schedule = [rng.randrange(len(cases)) for _ in range(tasks)]
+
+    def run(case_index):
+        case = cases[case_index]
+        return case_index, summarize_case(summarizers[case["segmenter"]], case["text"])
+
+    mismatches = []
+    errors = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(run, case_index) for case_index in schedule]
+        for future in futures:
+            try:
+                case_index, result = future.result()
+            except Exception as e:
+                errors.append(repr(e))
+                continue
+            if result != expected[case_index]:
+                case = cases[case_index]
+                mismatches.append({"case": case["name"], "segmenter": case["segmenter"],
+                                   "fields": [key for key in result if result[key] != expected[case_index][key]]})
+    concurrent_seconds = time.perf_counter() - start
+
+    return {
+        "cases": len(cases),
+        "tasks": tasks,
+        "threads": threads,
+        "serial_seconds_per_case": serial_seconds / len(cases),
+        "concurrent_seconds": concurrent_seconds,
+        "concurrent_tasks_per_second": tasks / concurrent_seconds,
+        "mismatches": mismatches,
+        "errors": errors,
+        "passed": not mismatches and not errors,
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['tasks']} concurrent tasks over {report['cases']} cases on {report['threads']} threads",
+        f"serial: {report['serial_seconds_per_case'] * 1000:.1f} ms/case, "
+        f"concurrent: {report['concurrent_seconds']:.2f} s ({report['concurrent_tasks_per_second']:.1f} tasks/s)",
+        f"mismatches: {len(report['mismatches'])}, errors: {len(report['errors'])}",
+    ]
+    for mismatch in report["mismatches"][:10]:
+        lines.append(f"  MISMATCH {mismatch['case']} ({mismatch['segmenter']}): {', '.join(mismatch['fields'])}")
+    for error in report["errors"][:10]:
+        lines.append(f"  ERROR {error}")
+    lines.append("PASSED" if report["passed"] else "FAILED")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check concurrent summaries against serial runs.")
+    parser.add_argument("--tasks", type=int, default=400, help="Number of concurrent summaries to run.")
+    parser.add_argument("--threads", type=int, default=16, help="Thread pool size.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the shuffled task schedule.")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    args = parser.parse_args()
+
+    report = run_stress_test(args.tasks, args.threads, args.seed)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    sys.exit(0 if report["passed"] else 1)
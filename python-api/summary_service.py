@@ -0,0 +1,119 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from nltk.tokenize import word_tokenize
+
+from deadline import Deadline
+from execution_planner import plan_execution, truncate_to_sentences
+from extractive_functions import Extractive_Summarizer, Extractive_Summarizer_All_Lengths, build_summary
+from ranking_cache import ranking_cache
+from sentence_segmenters import get_segmenter
+
+# Builds the summary payloads shared by the synchronous endpoints and the background job workers
+
+# Size of the shared thread pool that runs summaries (the ranking core is reentrant, and NumPy releases the GIL
+# in its heavy stages); 0 falls back to asyncio's default executor
+SUMMARY_THREADS = int(os.getenv("SUMMARY_THREADS", "4"))
+
+_summary_executor = None
+_summary_executor_lock = threading.Lock()
+
+
+def get_summary_executor() -> Optional[ThreadPoolExecutor]:
+    global _summary_executor
+    if SUMMARY_THREADS <= 0:
+        return None
+    with _summary_executor_lock:
+        if _summary_executor is None:
+            _summary_executor = ThreadPoolExecutor(max_workers=SUMMARY_THREADS, thread_name_prefix="summary")
+        return _summary_executor
+
+
+def shutdown_summary_executor():
+    global _summary_executor
+    with _summary_executor_lock:
+        if _summary_executor is not None:
+            _summary_executor.shutdown(wait=False, cancel_futures=True)
+            _summary_executor = None
+
+
+def count_words(text: str) -> int:
+    return len([token for token in word_tokenize(text) if token.isalnum()])
+
+
+def summary_details(summary: str, segment_sentences) -> dict:
+    return {
+        "summary": summary,
+        "summary_sentences_count": len(segment_sentences(summary)),
+        "summaryWordCount": count_words(summary)
+    }
+
+
+# The part of the text the execution plan allows (all of it unless the plan had to cut it to fit the memory budget)
+def planned_text(text: str, plan) -> str:
+    return text if plan.max_sentences is None else truncate_to_sentences(text, plan.max_sentences)
+
+
+# Summarizes the text at one length and returns the response fields shared by every summary endpoint
+def summarize_text(text: str, ratio: float, selectedOptionValue: str, segmenter: Optional[str] = None,
+                   deadline: Deadline = None) -> dict:
+    segment_sentences = get_segmenter(segmenter)
+    plan = plan_execution(text, deadline)
+    summary, top_n_nouns_dict = Extractive_Summarizer(
+        planned_text(text, plan), ratio, selectedOptionValue, segmenter, deadline, plan.mode
+    )
+    return {
+        **summary_details(summary, segment_sentences),
+        "original_length_sentences": len(segment_sentences(text)),
+        "keywords": list(top_n_nouns_dict.keys()),
+        "originalWordCount": count_words(text),
+        "degradations": plan.degradations() + (deadline.degradations if deadline is not None else []),
+        "execution_plan": plan.as_dict()
+    }
+
+
+# Ranks the text once, caches the ranking and returns the response fields for every summary length
+def summarize_all_lengths(text: str, selectedOptionValue: str, segmenter: Optional[str] = None,
+                          deadline: Deadline = None) -> dict:
+    segment_sentences = get_segmenter(segmenter)
+    plan = plan_execution(text, deadline)
+    summaries, top_n_nouns_dict, ranking_result = Extractive_Summarizer_All_Lengths(
+        planned_text(text, plan), segmenter, deadline, plan.mode
+    )
+    ranking = {
+        "sentences": ranking_result.sentences,
+        "ranked_indices": ranking_result.ranked_indices,
+        "keywords": list(top_n_nouns_dict.keys()),
+        "segmenter": segmenter,
+        "original_length_sentences": len(segment_sentences(text)),
+        "originalWordCount": count_words(text)
+    }
+    ranking_id = ranking_cache.put(ranking)
+    selected_summary = build_summary(ranking["sentences"], ranking["ranked_indices"], selectedOptionValue)
+    return {
+        **summary_details(selected_summary, segment_sentences),
+        "summaries": {option: summary_details(summary, segment_sentences) for option, summary in summaries.items()},
+        "ranking_id": ranking_id,
+        "original_length_sentences": ranking["original_length_sentences"],
+        "keywords": ranking["keywords"],
+        "originalWordCount": ranking["originalWordCount"],
+        "degradations": (plan.degradations() + (deadline.degradations if deadline is not None else [])
+                         + ([] if ranking_id is not None else ["ranking_not_cached"])),
+        "execution_plan": plan.as_dict()
+    }
+
+
+def file_summary_response(result: dict, raw_text: str, filename: str, ratio: float, selectedOptionValue: str,
+                          pdf_extraction: Optional[dict] = None) -> dict:
+    return {
+        **result,
+        "originalContentText": raw_text,
+        "original_filename": filename,
+        "processed_ratio": ratio,
+        "selectedOptionValue": selectedOptionValue,
+        "pdf_extraction": pdf_extraction,
+        "message": "File processed and summarized successfully."
+    }
+